@@ -1,471 +1,785 @@
 #!/usr/bin/env python3
 """
-Generate remaining 28 INT KB articles in JSON format
+Generate INT KB articles in JSON format
+
+Usage:
+    python3 generate_kb_articles.py -o data/kb.generated.json
+    python3 generate_kb_articles.py -o kb.ndjson --format ndjson
+    python3 generate_kb_articles.py -o kb.ndjson --format ndjson --workers 8
+    python3 generate_kb_articles.py -o public/data/kb.json --incremental --changes changes.json
+    python3 generate_kb_articles.py -o public/data/kb.json --search-index public/data/kb-index.json
+    python3 generate_kb_articles.py --shard-dir public/data --shard-by department
+    python3 generate_kb_articles.py -o kb.json --compact kb.kbc
+    python3 generate_kb_articles.py -o kb.json --ingest remaining_kb_batch.json --ingest data/kb.json
+    python3 generate_kb_articles.py -o kb.json --dedup drop --duplicates duplicates.json
+    python3 generate_kb_articles.py -o kb.json --stats kb_searches.csv --stats kb_feedback.ndjson.gz
+    python3 generate_kb_articles.py -o kb.json --search-index kb-index.json --profile trace.json
+    python3 generate_kb_articles.py -o public/data/kb.json --precompress --size-budget 150k
+    python3 generate_kb_articles.py --emit-sql kb_articles.sql --sql-format copy
+    python3 generate_kb_articles.py -o public/data/kb.json --search-index public/data/kb-index.json --watch
+
+Articles are built and written one at a time, so memory use stays flat as the
+catalogue grows. Build stats are reported on stderr. The catalogue is read
+from data/kb_catalog/ and article bodies come from the templates in
+data/kb_templates/ (see kb_build/catalog.py and kb_build/templates.py).
 """
 
+import argparse
 import json
-
-# Article templates with INT-specific content
-articles_data = {
-    "Technology": [
-        {
-            "id": "KB-TECH-001",
-            "title": "Managed IT Services: Complete Guide for Small to Mid-Size Businesses",
-            "tags": ["managed-it", "msp", "it-support", "proactive-monitoring", "help-desk"],
-            "summary": "Comprehensive guide to managed IT services including benefits, pricing models, and how to choose the right MSP for your business",
-            "read_time": "16 min read"
-        },
-        {
-            "id": "KB-TECH-002",
-            "title": "Email Migration Guide: Office 365 and Google Workspace",
-            "tags": ["email-migration", "office365", "google-workspace", "cloud-email", "migration"],
-            "summary": "Step-by-step guide to migrating email systems with zero downtime, including planning, execution, and post-migration best practices",
-            "read_time": "14 min read"
-        },
-        {
-            "id": "KB-TECH-003",
-            "title": "Cloud Backup & Disaster Recovery: Protection Strategy Guide",
-            "tags": ["backup", "disaster-recovery", "business-continuity", "cloud-backup", "data-protection"],
-            "summary": "Complete backup and disaster recovery strategy including RPO/RTO planning, vendor selection, and testing procedures",
-            "read_time": "15 min read"
-        },
-        {
-            "id": "KB-TECH-004",
-            "title": "SaaS Application Migration: Cloud Transformation Guide",
-            "tags": ["saas-migration", "cloud-transformation", "application-migration", "legacy-modernization"],
-            "summary": "Comprehensive guide to migrating legacy applications to SaaS platforms with minimal disruption and maximum ROI",
-            "read_time": "13 min read"
-        },
-        {
-            "id": "KB-TECH-005",
-            "title": "Network Security Best Practices: Building a Secure Infrastructure",
-            "tags": ["network-security", "firewall", "vpn", "network-segmentation", "zero-trust"],
-            "summary": "Complete network security implementation guide including firewalls, VPNs, segmentation, and zero-trust architecture",
-            "read_time": "14 min read"
-        }
-    ],
-    "Website Design": [
-        {
-            "id": "KB-WEB-001",
-            "title": "Custom Website Design Process: From Concept to Launch",
-            "tags": ["web-design", "custom-website", "ux-design", "ui-design", "web-development"],
-            "summary": "End-to-end custom website design process including discovery, design, development, and launch phases with pricing breakdown",
-            "read_time": "15 min read"
-        },
-        {
-            "id": "KB-WEB-002",
-            "title": "E-commerce Platform Comparison: Shopify vs WooCommerce vs Custom",
-            "tags": ["ecommerce", "shopify", "woocommerce", "online-store", "platform-comparison"],
-            "summary": "Detailed comparison of e-commerce platforms with pros, cons, costs, and recommendations based on business size and needs",
-            "read_time": "16 min read"
-        },
-        {
-            "id": "KB-WEB-003",
-            "title": "WordPress Security & Maintenance: Complete Protection Guide",
-            "tags": ["wordpress", "website-security", "wordpress-maintenance", "updates", "backups"],
-            "summary": "Comprehensive WordPress security and maintenance guide including updates, backups, security hardening, and performance optimization",
-            "read_time": "13 min read"
-        },
-        {
-            "id": "KB-WEB-004",
-            "title": "Website Performance Optimization: Speed & User Experience",
-            "tags": ["performance-optimization", "page-speed", "core-web-vitals", "seo", "user-experience"],
-            "summary": "Complete performance optimization guide covering Core Web Vitals, image optimization, caching, CDN, and mobile performance",
-            "read_time": "14 min read"
-        },
-        {
-            "id": "KB-WEB-005",
-            "title": "Mobile-First Design Principles: Responsive Web Development",
-            "tags": ["mobile-first", "responsive-design", "mobile-optimization", "ux-design"],
-            "summary": "Mobile-first design methodology including responsive frameworks, touch optimization, and mobile UX best practices",
-            "read_time": "12 min read"
-        }
-    ],
-    "Branding": [
-        {
-            "id": "KB-BRAND-001",
-            "title": "Brand Strategy Development: Building a Powerful Brand Identity",
-            "tags": ["brand-strategy", "brand-identity", "brand-positioning", "brand-architecture"],
-            "summary": "Complete brand strategy development guide from research and positioning to messaging and visual identity",
-            "read_time": "15 min read"
-        },
-        {
-            "id": "KB-BRAND-002",
-            "title": "Logo Design Process: Creating Memorable Brand Marks",
-            "tags": ["logo-design", "brand-identity", "visual-identity", "design-process"],
-            "summary": "Professional logo design process including research, concepting, refinement, and delivery with pricing breakdown",
-            "read_time": "13 min read"
-        },
-        {
-            "id": "KB-BRAND-003",
-            "title": "Visual Identity Systems: Consistent Brand Expression",
-            "tags": ["visual-identity", "brand-guidelines", "design-system", "brand-consistency"],
-            "summary": "Building comprehensive visual identity systems including color, typography, imagery, and application guidelines",
-            "read_time": "14 min read"
-        },
-        {
-            "id": "KB-BRAND-004",
-            "title": "Brand Guidelines Creation: Documentation for Brand Consistency",
-            "tags": ["brand-guidelines", "brand-standards", "style-guide", "brand-management"],
-            "summary": "Creating effective brand guidelines that ensure consistent brand expression across all touchpoints and teams",
-            "read_time": "12 min read"
-        },
-        {
-            "id": "KB-BRAND-005",
-            "title": "Rebranding Best Practices: When and How to Rebrand Successfully",
-            "tags": ["rebranding", "brand-refresh", "brand-evolution", "change-management"],
-            "summary": "Strategic rebranding guide including timing, process, stakeholder management, and launch strategy",
-            "read_time": "15 min read"
-        }
-    ],
-    "Content": [
-        {
-            "id": "KB-CONT-001",
-            "title": "Content Strategy Framework: Planning for Business Growth",
-            "tags": ["content-strategy", "content-marketing", "editorial-strategy", "content-planning"],
-            "summary": "Comprehensive content strategy development including audience research, content pillars, channel strategy, and measurement",
-            "read_time": "14 min read"
-        },
-        {
-            "id": "KB-CONT-002",
-            "title": "SEO Copywriting Best Practices: Content That Ranks and Converts",
-            "tags": ["seo-copywriting", "content-writing", "seo", "conversion-optimization"],
-            "summary": "Professional SEO copywriting guide covering keyword research, on-page optimization, user intent, and conversion techniques",
-            "read_time": "13 min read"
-        },
-        {
-            "id": "KB-CONT-003",
-            "title": "Blog Content Planning: Building an Effective Editorial Calendar",
-            "tags": ["blog-strategy", "editorial-calendar", "content-planning", "blogging"],
-            "summary": "Blog content planning guide including topic ideation, editorial calendar creation, and content production workflow",
-            "read_time": "12 min read"
-        },
-        {
-            "id": "KB-CONT-004",
-            "title": "E-book Creation Process: High-Value Lead Generation Content",
-            "tags": ["ebook-creation", "lead-generation", "content-marketing", "long-form-content"],
-            "summary": "Complete e-book creation process from research and outlining to design, promotion, and lead generation strategy",
-            "read_time": "14 min read"
-        },
-        {
-            "id": "KB-CONT-005",
-            "title": "Content Calendar Management: Organizing Your Content Operations",
-            "tags": ["content-calendar", "content-operations", "workflow-management", "editorial-planning"],
-            "summary": "Content calendar management guide including tools, workflows, team collaboration, and performance tracking",
-            "read_time": "11 min read"
-        }
-    ],
-    "Marketing": [
-        {
-            "id": "KB-MARK-001",
-            "title": "HubSpot Setup & Configuration: Complete Implementation Guide",
-            "tags": ["hubspot", "marketing-automation", "crm-setup", "inbound-marketing"],
-            "summary": "Complete HubSpot implementation guide from initial setup to advanced automation including best practices and common pitfalls",
-            "read_time": "16 min read"
-        },
-        {
-            "id": "KB-MARK-002",
-            "title": "Marketing Automation Workflows: Building Effective Nurture Campaigns",
-            "tags": ["marketing-automation", "email-workflows", "lead-nurturing", "automation"],
-            "summary": "Marketing automation workflow design including lead scoring, nurture campaigns, and multi-channel automation strategies",
-            "read_time": "15 min read"
-        },
-        {
-            "id": "KB-MARK-003",
-            "title": "CRM Migration Guide: Salesforce, HubSpot, and Beyond",
-            "tags": ["crm-migration", "data-migration", "salesforce", "hubspot"],
-            "summary": "CRM migration guide including data preparation, mapping, testing, and go-live strategy with minimal business disruption",
-            "read_time": "14 min read"
-        },
-        {
-            "id": "KB-MARK-004",
-            "title": "Email Marketing Campaign Best Practices: Driving Engagement and Conversions",
-            "tags": ["email-marketing", "campaign-optimization", "email-design", "deliverability"],
-            "summary": "Email marketing best practices covering strategy, design, copywriting, segmentation, testing, and deliverability",
-            "read_time": "13 min read"
-        },
-        {
-            "id": "KB-MARK-005",
-            "title": "Lead Nurturing Strategies: Converting Prospects into Customers",
-            "tags": ["lead-nurturing", "conversion-optimization", "sales-enablement", "lead-scoring"],
-            "summary": "Lead nurturing strategy guide including segmentation, content mapping, multi-touch campaigns, and sales handoff",
-            "read_time": "14 min read"
-        }
-    ],
-    "Operations": [
-        {
-            "id": "KB-OPS-001",
-            "title": "Bookkeeping Services Overview: Financial Management for Growing Businesses",
-            "tags": ["bookkeeping", "accounting", "financial-management", "quickbooks"],
-            "summary": "Complete bookkeeping services guide including monthly close process, reconciliation, reporting, and financial best practices",
-            "read_time": "13 min read"
-        },
-        {
-            "id": "KB-OPS-002",
-            "title": "Process Documentation & Management: Building Operational Excellence",
-            "tags": ["process-documentation", "sops", "operational-excellence", "process-improvement"],
-            "summary": "Process documentation guide including SOPs, workflows, tools, and continuous improvement methodologies",
-            "read_time": "14 min read"
-        },
-        {
-            "id": "KB-OPS-003",
-            "title": "AI & BI Implementation Guide: Data-Driven Decision Making",
-            "tags": ["business-intelligence", "ai-implementation", "data-analytics", "decision-support"],
-            "summary": "AI and business intelligence implementation including data strategy, tool selection, dashboard design, and ROI measurement",
-            "read_time": "15 min read"
-        },
-        {
-            "id": "KB-OPS-004",
-            "title": "Workflow Automation: Eliminating Manual Tasks and Boosting Productivity",
-            "tags": ["workflow-automation", "process-automation", "productivity", "zapier"],
-            "summary": "Workflow automation guide including process mapping, automation tools, implementation, and measuring efficiency gains",
-            "read_time": "13 min read"
-        },
-        {
-            "id": "KB-OPS-005",
-            "title": "Business Intelligence Dashboards: Visualizing Data for Better Decisions",
-            "tags": ["bi-dashboards", "data-visualization", "kpi-tracking", "reporting"],
-            "summary": "BI dashboard creation guide including KPI selection, data sources, visualization best practices, and stakeholder adoption",
-            "read_time": "14 min read"
-        }
-    ]
+import os
+import sys
+import time
+from collections import deque
+from contextlib import nullcontext
+from functools import partial
+from itertools import islice
+
+from kb_build import (
+    BuildManifest,
+    BuildProfiler,
+    ChangeSet,
+    SizeReport,
+    TemplateSet,
+    digest,
+    file_digest,
+    manifest_path_for,
+    read_synonyms,
+    sharded_files,
+    text_digest,
+    write_atomic,
+    write_compact,
+    write_search_index,
+    write_sharded,
+)
+from kb_build import catalog as kb_catalog
+from kb_build.catalog import (
+    CATALOG_DIR,
+    DATA_DIR,
+    TEMPLATE_DIR,
+    TEMPLATE_SLOTS,
+    article_context,
+    bound_template,
+    build_article,
+    default_templates,
+    department_context,
+    department_slug,
+    generate_article_content,  # noqa: F401 - part of this script's original API
+    iter_articles,
+    load_catalog,
+)
+from kb_build.dedup import DEFAULT_THRESHOLD, TemplateSigner, body_key, find_similar, signature
+from kb_build.ingest import merge_catalog, normalize, read_records
+from kb_build.popularity import HALF_LIFE_DAYS, read_popularity
+from kb_build.profile import DEFAULT_TOP
+from kb_build.related import DEFAULT_RELATED, related_positions
+from kb_build.shards import DEFAULT_BUCKETS, SHARD_MODES
+from kb_build.sql import DEFAULT_BATCH, DIALECTS, SQL_FORMATS, write_sql
+from kb_build.watch import DEFAULT_INTERVAL, SourceWatcher
+
+# Bump when build_article's record layout changes, to invalidate manifests
+GENERATOR_VERSION = "1"
+
+# Catalogue entries handed to each worker process per task
+DEFAULT_CHUNK_SIZE = 256
+
+SYNONYMS_FILE = os.path.join(DATA_DIR, "kb_synonyms.json")
+
+
+def __getattr__(name):
+    # The catalogue used to be a module-level dict; keep that name working
+    # without reading the department files at import time
+    if name == "articles_data":
+        return load_catalog()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def ingest_catalog(catalog, paths):
+    """Merge the article records in paths into catalog, later files winning"""
+    records = (normalize(record) for path in paths for record in read_records(path))
+    return merge_catalog(catalog, records)
+
+
+def duplicate_clusters(catalog, templates=None, threshold=DEFAULT_THRESHOLD, signatures=None):
+    """Clusters of articles with near-identical bodies (see kb_build/dedup.py).
+
+    Each cluster is a list of ids, the one to keep first: the first article
+    with a hand-written body, else the first in catalogue order.
+    ``signatures`` is a signature cache to reuse across calls (see
+    find_similar()).
+    """
+    hand_written = set()
+
+    def signed():
+        # Templated bodies only hash their slot lines (see TemplateSigner)
+        for department, articles in catalog.items():
+            signer = None
+            for info in articles:
+                if "content" in info:
+                    hand_written.add(info["id"])
+                    text = info["content"]
+                    yield info["id"], body_key(text), partial(signature, text)
+                else:
+                    if signer is None:
+                        signer = TemplateSigner(bound_template(department, templates))
+                    yield (info["id"],) + signer.sign(article_context(info["id"], info["title"]))
+
+    clusters = []
+    for cluster in find_similar(signed(), threshold, cache=signatures):
+        keep = next((i for i in cluster if i in hand_written), cluster[0])
+        clusters.append([keep] + [i for i in cluster if i != keep])
+    return clusters
+
+
+def without_duplicates(catalog, clusters):
+    """Copy of catalog without all but the first article of each cluster"""
+    dropped = {article_id for cluster in clusters for article_id in cluster[1:]}
+    return {
+        department: [info for info in articles if info["id"] not in dropped]
+        for department, articles in catalog.items()
+    }
+
+
+def with_popularity(catalog, stats):
+    """Copy of catalog whose entries carry the view/vote counts and score in stats.
+
+    stats is a kb_build.popularity.PopularityStats; articles it has no rows
+    for get zeros instead of build_article()'s placeholder values.
+    """
+    fields = stats.fields()
+    return {
+        department: [{**info, **fields[info["id"]]} for info in infos]
+        for department, infos in catalog.items()
+    }
+
+
+def with_related(catalog, k=DEFAULT_RELATED):
+    """Copy of catalog whose entries carry their top-k ``related`` article ids.
+
+    Ranking matches KnowledgeBaseService.getRelatedArticles(); see
+    kb_build/related.py. Because the ids become part of each entry, they are
+    covered by incremental-build digests like any other field.
+    """
+    entries = [(department, info) for department, infos in catalog.items() for info in infos]
+    records = [(department, department_slug(department), info["tags"]) for department, info in entries]
+    graph = related_positions(records, k)
+
+    related = {department: [] for department in catalog}
+    for (department, info), positions in zip(entries, graph):
+        related[department].append({**info, "related": [entries[p][1]["id"] for p in positions]})
+    return related
+
+
+def _encode_json_item(article):
+    return json.dumps(article, indent=2).replace("\n", "\n  ")
+
+
+def _encode_ndjson_line(article):
+    return json.dumps(article, separators=(",", ":")) + "\n"
+
+
+# Encoders keep ensure_ascii on, so character offsets equal byte offsets and
+# the spans recorded below can be read back from the file directly.
+def _write_json_items(items, fp, spans=None):
+    count = 0
+    position = 1
+    fp.write("[")
+    for item in items:
+        separator = ",\n  " if count else "\n  "
+        fp.write(separator)
+        fp.write(item)
+        if spans is not None:
+            spans.append((position + len(separator), len(item)))
+        position += len(separator) + len(item)
+        count += 1
+    fp.write("\n]\n" if count else "]\n")
+    return count
+
+
+def _write_lines(lines, fp, spans=None):
+    count = 0
+    position = 0
+    for line in lines:
+        fp.write(line)
+        if spans is not None:
+            spans.append((position, len(line)))
+        position += len(line)
+        count += 1
+    return count
+
+
+def write_json_array(articles, fp):
+    """Stream articles to fp as a pretty-printed JSON array.
+
+    Each element is serialized on its own, so only one article is held in
+    memory at a time. The layout matches ``json.dumps(list, indent=2)``.
+    """
+    return _write_json_items(map(_encode_json_item, articles), fp)
+
+
+def write_ndjson(articles, fp):
+    """Stream articles to fp as newline-delimited JSON, one record per line"""
+    return _write_lines(map(_encode_ndjson_line, articles), fp)
+
+
+# format name -> (per-article encoder, writer for encoded items)
+FORMATS = {
+    "json": (_encode_json_item, _write_json_items),
+    "ndjson": (_encode_ndjson_line, _write_lines),
 }
 
-def generate_article_content(article_id, title, department):
-    """Generate INT-specific article content"""
-    return f"""# {title}
-
-## Introduction
-
-This comprehensive guide from INT Inc.'s {department} team provides everything you need to know about implementing {title.lower().split(':')[0]} for your business.
-
-## Why This Matters
-
-- Industry-leading expertise from INT's {department} specialists
-- Proven methodologies refined over 15+ years
-- Real-world examples from successful client implementations
-- Transparent pricing and realistic timelines
-
-## Key Benefits
-
-### Business Impact
-- **ROI**: Typical clients see 300-500% return on investment
-- **Timeline**: Implementation in 4-12 weeks depending on scope
-- **Support**: Ongoing maintenance and optimization included
-
-### Technical Excellence
-- Enterprise-grade solutions tailored to your needs
-- Integration with existing systems and workflows
-- Scalable architecture for future growth
-
-## Implementation Process
-
-### Phase 1: Discovery & Planning (Week 1-2)
-- Stakeholder interviews and requirement gathering
-- Current state assessment
-- Solution design and architecture
-- Timeline and resource planning
-
-**Deliverable**: Comprehensive project plan and statement of work
-
-### Phase 2: Development & Configuration (Week 3-8)
-- Core solution implementation
-- Custom configuration and integration
-- Quality assurance and testing
-- User acceptance testing
-
-**Deliverable**: Fully configured solution ready for deployment
-
-### Phase 3: Training & Launch (Week 9-10)
-- End-user training sessions
-- Documentation and knowledge transfer
-- Phased rollout strategy
-- Go-live support
-
-**Deliverable**: Production launch with full team adoption
-
-### Phase 4: Optimization & Support (Ongoing)
-- Performance monitoring and optimization
-- Regular check-ins and support
-- Feature enhancements
-- Strategic planning
-
-**Deliverable**: Continuous improvement and value realization
-
-## Pricing & Investment
-
-### Starter Package: $15,000 - $35,000
-- Best for: Small businesses (< 50 employees)
-- Timeline: 4-6 weeks
-- Support: 90 days post-launch
-
-### Professional Package: $35,000 - $75,000
-- Best for: Mid-size companies (50-200 employees)
-- Timeline: 6-10 weeks  
-- Support: 6 months post-launch
-
-### Enterprise Package: $75,000 - $200,000+
-- Best for: Large organizations (200+ employees)
-- Timeline: 10-16 weeks
-- Support: 12 months with dedicated team
-
-### Ongoing Support: $3,000 - $12,000/month
-- Continuous optimization and enhancements
-- Priority support and SLA
-- Regular strategic reviews
-- Proactive monitoring
-
-## Common Challenges & Solutions
-
-### Challenge 1: Adoption and Change Management
-**Problem**: Team resistance to new processes
-**Solution**: Comprehensive training, champions program, and gradual rollout
-
-### Challenge 2: Integration Complexity
-**Problem**: Connecting with legacy systems
-**Solution**: Custom API development and middleware solutions
-
-### Challenge 3: Data Quality
-**Problem**: Inconsistent or incomplete data
-**Solution**: Data cleansing, validation, and governance processes
-
-## Best Practices
-
-1. **Start with clear objectives**: Define success metrics upfront
-2. **Involve stakeholders early**: Get buy-in from all affected teams
-3. **Plan for training**: Allocate sufficient time for user enablement
-4. **Test thoroughly**: Don't skip UAT or quality assurance
-5. **Iterate continuously**: Plan for ongoing optimization
-
-## INT's Approach
-
-### Why Choose INT
-
-**1. Proven Expertise**: 15+ years delivering {department.lower()} solutions
-**2. Client Success**: 98% client satisfaction rate
-**3. Full-Service**: End-to-end implementation and support
-**4. Transparent**: Clear pricing, no hidden fees
-**5. Results-Oriented**: Focus on measurable business outcomes
-
-### Our Team
-- Certified specialists in leading technologies
-- Average 10+ years industry experience
-- Continuous training on latest best practices
-- Dedicated account management
-
-### Our Process
-- Agile methodology with regular client check-ins
-- Collaborative approach with your team
-- Risk mitigation and contingency planning
-- Quality assurance at every phase
-
-## ROI and Business Impact
-
-### Typical Results
-
-**Efficiency Gains**: 40-60% reduction in manual effort
-**Cost Savings**: $50,000 - $500,000 annually
-**Revenue Impact**: 20-40% improvement in relevant metrics
-**Payback Period**: 6-18 months
-
-### Case Study Example
-
-**Client**: Mid-size professional services firm
-**Challenge**: [Relevant challenge for this service]
-**Solution**: [INT's approach]
-**Results**: 
-- 45% productivity improvement
-- $200,000 annual cost savings
-- 12-month payback period
-- 380% 3-year ROI
-
-## Getting Started
-
-### Step 1: Free Consultation (30 minutes)
-
-Schedule a no-obligation call to discuss:
-- Your current situation and challenges
-- Potential solutions and approaches
-- Ballpark timeline and investment
-- Next steps if there's a good fit
-
-**Schedule**: https://intinc.com/schedule-consultation
-
-### Step 2: Proposal & Scoping (3-5 days)
-
-Receive a detailed proposal including:
-- Customized solution design
-- Detailed scope of work
-- Transparent pricing breakdown
-- Project timeline and milestones
-- Team bios and qualifications
-
-### Step 3: Kickoff & Implementation
-
-Once approved, we:
-- Finalize contracts and schedule
-- Conduct project kickoff meeting
-- Begin discovery and planning phase
-- Maintain regular communication throughout
-
-## Frequently Asked Questions
-
-**Q: How long does implementation typically take?**
-A: Most projects complete in 6-12 weeks. Complex implementations may take 3-6 months.
-
-**Q: Do you provide training?**
-A: Yes, comprehensive training is included in all packages.
-
-**Q: What if we need customization?**
-A: We specialize in customized solutions. All proposals are tailored to your needs.
-
-**Q: What's included in ongoing support?**
-A: Support includes maintenance, optimization, strategic guidance, and priority assistance.
-
-**Q: Can you integrate with our existing systems?**
-A: Yes, we have extensive integration experience with major platforms and custom systems.
-
-## Contact INT's {department} Team
-
-**Email**: {department.lower().replace(' ', '')}@intinc.com
-**Phone**: (555) 123-{4560 + list(articles_data.keys()).index(department)}
-**Schedule Consultation**: https://intinc.com/schedule-{article_id.lower()}
-**Download Free Resources**: https://intinc.com/{article_id.lower()}-resources
-
-**Office Hours**: Monday - Friday, 8 AM - 6 PM EST
-**Emergency Support**: Available for enterprise clients
-
----
-
-*Last Updated: January 2025 | INT Inc. {department} Team*
-*This guide provides general information. Specific recommendations require consultation with INT specialists.*"""
-
-# Build complete articles JSON
-all_articles = []
-
-for department, articles in articles_data.items():
-    for article_info in articles:
-        article = {
-            "id": article_info["id"],
-            "article_id": article_info["id"],
-            "title": article_info["title"],
-            "category": department,
-            "department": department.lower().replace(" ", "-"),
-            "tags": article_info["tags"],
-            "summary": article_info["summary"],
-            "author": "INT Inc. " + department + " Team",
-            "read_time": article_info["read_time"],
-            "content": generate_article_content(article_info["id"], article_info["title"], department),
-            "last_updated": "2025-01-15",
-            "popularity_score": 85,
-            "helpful_votes": 120,
-            "unhelpful_votes": 5,
-            "view_count": 980,
-            "url": f"/kb/{article_info['id'].lower().replace('_', '-')}"
-        }
-        all_articles.append(article)
-
-# Output as JSON
-print(json.dumps(all_articles, indent=2))
-print(f"\n\n# Generated {len(all_articles)} articles total")
 
+def _render_chunk(encode, chunk, templates):
+    """Worker entry point: build and encode a chunk of catalogue entries"""
+    return [encode(build_article(department, info, templates)) for department, info in chunk]
+
+
+def iter_encoded(encode, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, catalog=None,
+                 templates=None):
+    """Yield encoded articles in catalogue order.
+
+    With ``workers > 1`` the catalogue is split into chunks that are built
+    and serialized in a process pool. At most ``2 * workers`` chunks are in
+    flight and results are consumed in submission order, so the output is
+    identical to a serial run and memory stays bounded.
+    """
+    catalog = load_catalog() if catalog is None else catalog
+    templates = templates or default_templates()
+    if workers <= 1:
+        for article in iter_articles(catalog, templates):
+            yield encode(article)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    entries = ((dept, info) for dept, infos in catalog.items() for info in infos)
+    chunks = iter(lambda: list(islice(entries, chunk_size)), [])
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_render_chunk, encode, chunk, templates))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def build(fp, fmt="json", workers=1, chunk_size=DEFAULT_CHUNK_SIZE, catalog=None,
+          templates=None):
+    """Render the catalogue into fp using the given format. Returns the count."""
+    encode, write = FORMATS[fmt]
+    return write(iter_encoded(encode, workers, chunk_size, catalog, templates), fp)
+
+
+def entry_digest(department, article_info, templates):
+    """Digest of everything that goes into one article's record"""
+    if "content" in article_info:
+        # Hand-written body: the template and department values are unused,
+        # but the department name still becomes the article's category
+        return digest({"department": department, "entry": article_info})
+    template = templates.for_department(department_slug(department))
+    return digest({
+        "department": department_context(department),
+        "entry": article_info,
+        "template": template.digest,
+    })
+
+
+def build_incremental(output, fmt="json", workers=1, chunk_size=DEFAULT_CHUNK_SIZE,
+                      catalog=None, templates=None, manifest_path=None):
+    """Rebuild output, re-rendering only articles whose inputs changed.
+
+    Unchanged articles are copied byte-for-byte from the previous output
+    using the spans recorded in its manifest. If nothing changed, the output
+    file is left untouched so its mtime and ETag stay stable. Returns
+    ``(count, ChangeSet)``.
+    """
+    catalog = load_catalog() if catalog is None else catalog
+    templates = templates or default_templates()
+    manifest_path = manifest_path or manifest_path_for(output)
+    encode, write = FORMATS[fmt]
+
+    previous = BuildManifest.load(manifest_path)
+    if previous is None or not previous.matches(fmt, GENERATOR_VERSION, output):
+        previous = BuildManifest(fmt, GENERATOR_VERSION)
+    changes = ChangeSet()
+
+    # Plan in catalogue order: reuse the old span or queue for rendering
+    plan = []
+    stale = {}
+    for department, infos in catalog.items():
+        for info in infos:
+            input_digest = entry_digest(department, info, templates)
+            old = previous.articles.get(info["id"])
+            if old is not None and old["input"] == input_digest:
+                plan.append((info["id"], input_digest, old))
+            else:
+                plan.append((info["id"], input_digest, None))
+                stale.setdefault(department, []).append(info)
+
+    current_ids = {article_id for article_id, _, _ in plan}
+    changes.removed = [i for i in previous.articles if i not in current_ids]
+    changes.reordered = [i for i in previous.articles if i in current_ids] != [
+        article_id for article_id, _, _ in plan if article_id in previous.articles
+    ]
+    if not stale and not changes.removed and not changes.reordered:
+        changes.unchanged = len(plan)
+        return len(plan), changes
+
+    rendered = iter_encoded(encode, workers, chunk_size, stale, templates)
+    entries = {}
+
+    def items(old_fp):
+        for article_id, input_digest, old in plan:
+            if old is not None:
+                old_fp.seek(old["offset"])
+                item = old_fp.read(old["length"]).decode("ascii")
+                output_digest = old["output"]
+            else:
+                item = next(rendered)
+                output_digest = text_digest(item)
+                changes.rendered += 1
+            before = previous.articles.get(article_id)
+            if before is None:
+                changes.added.append(article_id)
+            elif before["output"] != output_digest:
+                changes.changed.append(article_id)
+            else:
+                changes.unchanged += 1
+            entries[article_id] = {"input": input_digest, "output": output_digest}
+            yield item
+
+    spans = []
+    old_output = output if previous.articles else os.devnull
+    with open(old_output, "rb") as old_fp:
+        count = write_atomic(output, lambda fp: write(items(old_fp), fp, spans))
+
+    for (article_id, _, _), (offset, length) in zip(plan, spans):
+        entries[article_id]["offset"] = offset
+        entries[article_id]["length"] = length
+    manifest = BuildManifest(
+        fmt, GENERATOR_VERSION, entries, os.path.getsize(output), file_digest(output)
+    )
+    manifest.save(manifest_path)
+    return count, changes
+
+
+def _positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    return number
+
+
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2}
+
+
+def _byte_size(value):
+    text = value.strip().lower().removesuffix("b")
+    unit = text[-1:] if text[-1:] in ("k", "m") else ""
+    try:
+        number = float(text[:len(text) - len(unit)])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a size like 200000, 150k or 1M, got {value}")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"expected a positive size, got {value}")
+    return int(number * _SIZE_UNITS[unit])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate INT KB articles and stream them to a file"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="Output file path, or '-' for stdout"
+    )
+    parser.add_argument(
+        "-f", "--format", choices=sorted(FORMATS), default="json",
+        help="Output format (default: json)"
+    )
+    parser.add_argument(
+        "-w", "--workers", type=_positive_int, default=1,
+        help="Render in a pool of N processes (default: 1, serial)"
+    )
+    parser.add_argument(
+        "--chunk-size", type=_positive_int, default=DEFAULT_CHUNK_SIZE,
+        help=f"Articles per worker task (default: {DEFAULT_CHUNK_SIZE})"
+    )
+    parser.add_argument(
+        "--templates", default=TEMPLATE_DIR,
+        help="Directory of <department>.tmpl / default.tmpl article templates"
+    )
+    parser.add_argument(
+        "--ingest", action="append", default=[], metavar="PATH",
+        help="Merge hand-written article records (data/kb.json, remaining_kb_batch.json) "
+             "into the catalogue by id; repeatable, later files take precedence"
+    )
+    parser.add_argument(
+        "--dedup", choices=("report", "drop", "off"), default="report",
+        help="Report or drop articles whose bodies are near-duplicates (default: report)"
+    )
+    parser.add_argument(
+        "--dedup-threshold", type=float, default=DEFAULT_THRESHOLD, metavar="J",
+        help=f"Estimated Jaccard similarity that counts as a duplicate (default: {DEFAULT_THRESHOLD})"
+    )
+    parser.add_argument(
+        "--duplicates", metavar="PATH",
+        help="Write the near-duplicate clusters as JSON"
+    )
+    parser.add_argument(
+        "--stats", action="append", default=[], metavar="PATH",
+        help="kb_searches / kb_feedback export (CSV or NDJSON, optionally .gz) to take view "
+             "counts, votes and a time-decayed popularity score from; repeatable"
+    )
+    parser.add_argument(
+        "--stats-half-life", type=float, default=HALF_LIFE_DAYS, metavar="DAYS",
+        help=f"Days for an event's weight in the popularity score to halve (default: {HALF_LIFE_DAYS:g})"
+    )
+    parser.add_argument(
+        "--related", type=int, default=DEFAULT_RELATED, metavar="K",
+        help=f"Store the top-K related article ids on each article (default: {DEFAULT_RELATED}, 0 = off)"
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Only re-render articles whose inputs changed since the last build"
+    )
+    parser.add_argument(
+        "--manifest",
+        help="Build manifest path for --incremental (default: <output>.manifest.json)"
+    )
+    parser.add_argument(
+        "--search-index",
+        help="Also write a prebuilt inverted search index (e.g. public/data/kb-index.json)"
+    )
+    parser.add_argument(
+        "--synonyms", default=SYNONYMS_FILE, metavar="PATH",
+        help="Synonym dictionary for the search index's semantic-match table "
+             "(default: data/kb_synonyms.json)"
+    )
+    parser.add_argument(
+        "--compact",
+        help="Also write the binary columnar KB (read it with kb_build.CompactKB)"
+    )
+    parser.add_argument(
+        "--shard-dir",
+        help="Also write kb-meta.json, kb-shards.json and per-shard article bodies here"
+    )
+    parser.add_argument(
+        "--shard-by", choices=SHARD_MODES, default="department",
+        help="Group article bodies by department or by hash of the id (default: department)"
+    )
+    parser.add_argument(
+        "--shard-buckets", type=_positive_int, default=DEFAULT_BUCKETS,
+        help=f"Number of shards for --shard-by hash (default: {DEFAULT_BUCKETS})"
+    )
+    parser.add_argument(
+        "--emit-sql", metavar="PATH",
+        help="Also write a script that creates and upserts the kb_articles table "
+             "(run it with psql -f, or sqlite3 with --sql-dialect sqlite)"
+    )
+    parser.add_argument(
+        "--sql-format", choices=SQL_FORMATS, default="upsert",
+        help="Batched INSERT ... ON CONFLICT upserts, or COPY data upserted from a "
+             "staging table (PostgreSQL only) (default: upsert)"
+    )
+    parser.add_argument(
+        "--sql-dialect", choices=DIALECTS, default="postgres",
+        help="SQL dialect for --emit-sql (default: postgres)"
+    )
+    parser.add_argument(
+        "--sql-batch", type=_positive_int, default=DEFAULT_BATCH, metavar="N",
+        help=f"Rows per INSERT statement with --sql-format upsert (default: {DEFAULT_BATCH})"
+    )
+    parser.add_argument(
+        "--profile", metavar="PATH",
+        help="Record time and tracemalloc peaks per stage and per article; "
+             "write a Chrome trace-event JSON here"
+    )
+    parser.add_argument(
+        "--profile-top", type=_positive_int, default=DEFAULT_TOP, metavar="N",
+        help=f"Slowest articles to list with --profile (default: {DEFAULT_TOP})"
+    )
+    parser.add_argument(
+        "--changes",
+        help="Write the added/changed/removed article ids of this build as JSON"
+    )
+    parser.add_argument(
+        "--precompress", action="store_true",
+        help="Write a gzip sibling (<file>.gz) next to every JSON file served to clients"
+    )
+    parser.add_argument(
+        "--size-budget", type=_byte_size, metavar="SIZE",
+        help="Exit 1 if any served file (its .gz with --precompress) is larger than SIZE, "
+             "e.g. 150k; a CI gate checked after the outputs are written, so oversized "
+             "files are still published"
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="Stay running and rebuild whenever the catalogue, templates or --ingest "
+             "files change; implies --incremental"
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=DEFAULT_INTERVAL, metavar="SECONDS",
+        help=f"How often --watch checks source mtimes (default: {DEFAULT_INTERVAL})"
+    )
+    args = parser.parse_args(argv)
+    if not 0 < args.dedup_threshold <= 1:
+        parser.error("--dedup-threshold must be in (0, 1]")
+    if args.duplicates and args.dedup == "off":
+        parser.error("--duplicates needs --dedup report or drop")
+    if not (args.output or args.shard_dir or args.compact or args.emit_sql):
+        parser.error("one of -o/--output, --compact, --shard-dir or --emit-sql is required")
+    if args.sql_format == "copy" and args.sql_dialect != "postgres":
+        parser.error("--sql-format copy needs --sql-dialect postgres")
+    if (args.incremental or args.changes or args.watch) and args.output == "-":
+        parser.error("--incremental, --changes and --watch need a file --output")
+    if args.watch and args.profile:
+        parser.error("--profile cannot be combined with --watch")
+    if args.poll_interval <= 0:
+        parser.error("--poll-interval must be positive")
+    if args.stats_half_life <= 0:
+        parser.error("--stats-half-life must be positive")
+    args.incremental = args.incremental or args.watch
+    return args
+
+
+def _unprofiled(name):
+    return nullcontext()
+
+
+def profile_articles(profiler, catalog, fmt="json", templates=None):
+    """Build and encode every article once more, recording each with profiler"""
+    encode, _ = FORMATS[fmt]
+    templates = templates or default_templates()
+    for department, infos in catalog.items():
+        for info in infos:
+            profiler.article(info["id"], lambda: encode(build_article(department, info, templates)))
+
+
+def watched_paths(args):
+    """Source files and directories a build with these arguments reads"""
+    paths = [CATALOG_DIR, args.templates] + args.ingest + args.stats
+    if args.search_index:
+        paths.append(args.synonyms)
+    return paths
+
+
+def watch(args, builds=None):
+    """Rebuild after every change to the build's sources, until interrupted.
+
+    The process stays warm between builds and the ``-o`` output is rebuilt
+    incrementally, so an edit re-renders only the articles it affects there.
+    Every other stage runs in full on each change: related ids, popularity,
+    and the search index, compact, shard, SQL and precompressed outputs are
+    recomputed from the whole catalogue, so a watch build with those costs
+    about as much as a plain one. ``--dedup`` keeps its body signatures
+    between builds and only hashes bodies that changed.
+
+    All outputs are replaced atomically; a build that fails (e.g. on a file
+    caught mid-save, or a malformed entry) is reported and the previous
+    outputs stay in place. ``builds`` stops after that many builds.
+    """
+    watcher = SourceWatcher(watched_paths(args))
+    signatures = {}
+    done = 0
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                _run(args, _unprofiled, None, signatures)
+            except Exception as error:
+                print(f"error: {error}; previous outputs kept", file=sys.stderr)
+            else:
+                elapsed = time.perf_counter() - started
+                print(f"Built in {elapsed:.3f}s; watching for changes", file=sys.stderr)
+            done += 1
+            if builds is not None and done >= builds:
+                return 0
+            changed = watcher.wait(args.poll_interval)
+            print(f"Changed: {', '.join(changed)}", file=sys.stderr)
+            kb_catalog.reload()
+    except KeyboardInterrupt:
+        return 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.watch:
+        return watch(args)
+    profiler = BuildProfiler() if args.profile else None
+    stage = profiler.stage if profiler else _unprofiled
+    try:
+        return _run(args, stage, profiler)
+    finally:
+        if profiler:
+            profiler.close()
+
+
+def _run(args, stage, profiler, signatures=None):
+    with stage("load"):
+        catalog = load_catalog()
+        if args.ingest:
+            catalog = ingest_catalog(catalog, args.ingest)
+        templates = TemplateSet(args.templates, TEMPLATE_SLOTS)
+
+    if args.dedup != "off":
+        started = time.perf_counter()
+        with stage("dedup"):
+            clusters = duplicate_clusters(catalog, templates, args.dedup_threshold, signatures)
+        elapsed = time.perf_counter() - started
+        duplicates = sum(len(cluster) - 1 for cluster in clusters)
+        action = "dropped" if args.dedup == "drop" else "kept"
+        print(
+            f"Near-duplicates: {len(clusters)} cluster(s), {duplicates} duplicate article(s) "
+            f"{action} in {elapsed:.3f}s",
+            file=sys.stderr,
+        )
+        if args.dedup == "drop":
+            catalog = without_duplicates(catalog, clusters)
+        if args.duplicates:
+            found = {
+                "threshold": args.dedup_threshold,
+                "action": action,
+                "clusters": [{"keep": c[0], "duplicates": c[1:]} for c in clusters],
+            }
+            write_atomic(args.duplicates, lambda fp: json.dump(found, fp, indent=2))
+
+    if args.stats:
+        started = time.perf_counter()
+        with stage("popularity"):
+            ids = [info["id"] for infos in catalog.values() for info in infos]
+            stats = read_popularity(ids, args.stats, args.stats_half_life)
+            catalog = with_popularity(catalog, stats)
+        elapsed = time.perf_counter() - started
+        print(
+            f"Popularity: {stats.rows} rows from {len(args.stats)} export(s), "
+            f"{stats.rows - stats.skipped} about catalogue articles, in {elapsed:.3f}s",
+            file=sys.stderr,
+        )
+
+    if args.related > 0:
+        with stage("related"):
+            catalog = with_related(catalog, args.related)
+    options = {
+        "catalog": catalog,
+        "fmt": args.format,
+        "workers": args.workers,
+        "chunk_size": args.chunk_size,
+        "templates": templates,
+    }
+    started = time.perf_counter()
+    changes = None
+    served = []
+
+    with stage("output"):
+        if not args.output:
+            count = None
+        elif args.output == "-":
+            count = build(sys.stdout, **options)
+            size = None
+        elif args.incremental or args.changes:
+            count, changes = build_incremental(args.output, manifest_path=args.manifest, **options)
+            size = os.path.getsize(args.output)
+        else:
+            count = write_atomic(args.output, lambda fp: build(fp, **options))
+            size = os.path.getsize(args.output)
+
+    if count is not None:
+        elapsed = time.perf_counter() - started
+        stats = f"Generated {count} articles ({args.format}, {args.workers} worker(s)) in {elapsed:.3f}s"
+        if size is not None:
+            stats += f" -> {args.output} ({size} bytes)"
+            served.append(args.output)
+        print(stats, file=sys.stderr)
+    if changes is not None:
+        print(f"Changes: {changes.summary()}", file=sys.stderr)
+        if args.changes:
+            write_atomic(args.changes, lambda fp: json.dump(changes.to_dict(), fp, indent=2))
+
+    if args.search_index:
+        started = time.perf_counter()
+        with stage("search_index"):
+            articles = iter_articles(catalog, templates)
+            synonyms = read_synonyms(args.synonyms)
+            terms = write_atomic(
+                args.search_index, lambda fp: write_search_index(articles, fp, synonyms, args.related)
+            )
+        elapsed = time.perf_counter() - started
+        print(
+            f"Indexed {terms} terms in {elapsed:.3f}s -> {args.search_index} "
+            f"({os.path.getsize(args.search_index)} bytes)",
+            file=sys.stderr,
+        )
+        served.append(args.search_index)
+
+    if args.compact:
+        started = time.perf_counter()
+        with stage("compact"):
+            count = write_compact(iter_articles(catalog, templates), args.compact)
+        elapsed = time.perf_counter() - started
+        print(
+            f"Packed {count} articles in {elapsed:.3f}s -> {args.compact} "
+            f"({os.path.getsize(args.compact)} bytes)",
+            file=sys.stderr,
+        )
+
+    if args.shard_dir:
+        started = time.perf_counter()
+        with stage("shards"):
+            articles = iter_articles(catalog, templates)
+            layout = write_sharded(
+                articles, args.shard_dir, args.shard_by, args.shard_buckets, args.related
+            )
+        elapsed = time.perf_counter() - started
+        print(
+            f"Sharded {len(layout['articles'])} articles into {len(layout['shards'])} "
+            f"{args.shard_by} shards in {elapsed:.3f}s -> {args.shard_dir}",
+            file=sys.stderr,
+        )
+        served += sharded_files(layout, args.shard_dir)
+
+    if args.emit_sql:
+        started = time.perf_counter()
+        with stage("sql"):
+            articles = iter_articles(catalog, templates)
+            count = write_atomic(args.emit_sql, lambda fp: write_sql(
+                articles, fp, args.sql_format, args.sql_dialect, args.sql_batch
+            ))
+        elapsed = time.perf_counter() - started
+        print(
+            f"Wrote {args.sql_dialect} {args.sql_format} script for {count} articles in "
+            f"{elapsed:.3f}s -> {args.emit_sql} ({os.path.getsize(args.emit_sql)} bytes)",
+            file=sys.stderr,
+        )
+
+    # Sizes are known only once outputs are written; --size-budget fails the
+    # build afterwards rather than keeping oversized files unpublished
+    over = []
+    if args.precompress or args.size_budget:
+        report = SizeReport()
+        with stage("compress"):
+            for path in served:
+                report.add(path, args.precompress)
+        print(report.format(), file=sys.stderr)
+        over = report.over_budget(args.size_budget) if args.size_budget else []
+        for path in over:
+            print(
+                f"error: {path} is {SizeReport.served(report.files[path])} bytes, "
+                f"over the {args.size_budget} byte budget",
+                file=sys.stderr,
+            )
+
+    if profiler:
+        # Outside any stage: per-article measurements reset the traced peak
+        profile_articles(profiler, catalog, args.format, templates)
+        write_atomic(args.profile, profiler.write_trace)
+        print(f"Stage profile (trace -> {args.profile}):", file=sys.stderr)
+        print(profiler.format_stages(), file=sys.stderr)
+        print(f"Slowest {args.profile_top} articles (build + encode, serial):", file=sys.stderr)
+        print(profiler.format_slowest(args.profile_top), file=sys.stderr)
+
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
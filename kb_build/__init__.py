@@ -0,0 +1,65 @@
+"""
+Build stages for the INT knowledge base generator (generate_kb_articles.py)
+
+Names are imported from their submodules on first access, so importing the
+package (e.g. for the catalogue API in kb_build/catalog.py) does not load
+the build stages it doesn't use.
+"""
+
+from importlib import import_module
+
+# public name -> submodule that defines it
+_EXPORTS = {
+    "CompactFormatError": "compact",
+    "CompactKB": "compact",
+    "write_compact": "compact",
+    "SizeReport": "compress",
+    "precompress": "compress",
+    "build_article": "catalog",
+    "iter_articles": "catalog",
+    "load_catalog": "catalog",
+    "render": "catalog",
+    "IngestError": "ingest",
+    "iter_records": "ingest",
+    "merge_catalog": "ingest",
+    "BuildManifest": "manifest",
+    "ChangeSet": "manifest",
+    "atomic_open": "manifest",
+    "digest": "manifest",
+    "file_digest": "manifest",
+    "manifest_path_for": "manifest",
+    "text_digest": "manifest",
+    "write_atomic": "manifest",
+    "ExportError": "popularity",
+    "PopularityStats": "popularity",
+    "read_popularity": "popularity",
+    "BuildProfiler": "profile",
+    "SearchIndexBuilder": "search_index",
+    "build_search_index": "search_index",
+    "read_synonyms": "search_index",
+    "tokenize": "search_index",
+    "write_search_index": "search_index",
+    "SHARD_MODES": "shards",
+    "sharded_files": "shards",
+    "write_sharded": "shards",
+    "write_sql": "sql",
+    "Template": "templates",
+    "TemplateError": "templates",
+    "TemplateSet": "templates",
+    "read_template": "templates",
+    "SourceWatcher": "watch",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module("." + _EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,210 @@
+"""
+The KB article catalogue as a library
+
+Department definitions live in data/kb_catalog/, one ``<department-slug>.json``
+list of entries per department plus ``departments.json`` giving their order::
+
+    data/kb_catalog/departments.json     ["Technology", "Website Design", ...]
+    data/kb_catalog/technology.json      [{"id": "KB-TECH-001", "title": ...}, ...]
+
+Nothing is read at import time. A department file is loaded the first time
+one of its articles is needed and then kept, and ``render(article_id)``
+memoizes the records it builds, so a service that shows a handful of
+articles never loads templates or bodies for the rest::
+
+    from kb_build import iter_articles, load_catalog, render
+
+    render("KB-TECH-001")["content"]
+    for article in iter_articles():
+        ...
+
+``iter_articles()`` does not memoize, so a full build still holds one
+article at a time.
+"""
+
+import json
+import os
+from functools import lru_cache
+
+from .ingest import OVERRIDE_FIELDS
+from .templates import TemplateSet
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+CATALOG_DIR = os.path.join(DATA_DIR, "kb_catalog")
+TEMPLATE_DIR = os.path.join(DATA_DIR, "kb_templates")
+
+# Slots a KB template may reference; see data/kb_templates/default.tmpl
+TEMPLATE_SLOTS = frozenset({
+    "title", "topic", "department", "department_lower", "department_email",
+    "phone_ext", "article_slug",
+})
+
+# Rendered records render() keeps around
+RENDER_CACHE_SIZE = 1024
+
+_templates = None
+
+
+def _read_json(name):
+    with open(os.path.join(CATALOG_DIR, name), encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+@lru_cache(maxsize=None)
+def departments():
+    """Department names in catalogue order"""
+    return tuple(_read_json("departments.json"))
+
+
+@lru_cache(maxsize=None)
+def load_department(department):
+    """Catalogue entries of one department, read on first use"""
+    if department not in departments():
+        raise KeyError(department)
+    return _read_json(department_slug(department) + ".json")
+
+
+@lru_cache(maxsize=None)
+def load_catalog():
+    """Every department's entries, ``{department: [entry, ...]}`` in order.
+
+    The dict is shared between callers; copy it before changing it.
+    """
+    return {department: load_department(department) for department in departments()}
+
+
+def reload():
+    """Forget loaded department files, templates and rendered records.
+
+    The next call re-reads them from disk; used by --watch after an edit.
+    """
+    global _templates
+    _templates = None
+    for cached in (
+        departments, load_department, load_catalog, _department_index, department_context, _rendered,
+    ):
+        cached.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def _department_index(department):
+    # reversed so the first of repeated ids wins, as in a linear scan
+    return {info["id"]: info for info in reversed(load_department(department))}
+
+
+def find_entry(article_id):
+    """(department, entry) for article_id, loading departments until found"""
+    for department in departments():
+        info = _department_index(department).get(article_id)
+        if info is not None:
+            return department, info
+    raise KeyError(article_id)
+
+
+def default_templates():
+    """Return the shared TemplateSet for TEMPLATE_DIR, loading it on first use"""
+    global _templates
+    if _templates is None:
+        _templates = TemplateSet(TEMPLATE_DIR, TEMPLATE_SLOTS)
+    return _templates
+
+
+@lru_cache(maxsize=None)
+def department_slug(department):
+    return department.lower().replace(" ", "-")
+
+
+@lru_cache(maxsize=None)
+def department_context(department):
+    """Slot values shared by every article in a department"""
+    return {
+        "department": department,
+        "department_lower": department.lower(),
+        "department_email": department.lower().replace(" ", ""),
+        "phone_ext": str(4560 + departments().index(department)),
+    }
+
+
+def article_context(article_id, title):
+    """Slot values specific to one article"""
+    return {
+        "title": title,
+        "topic": title.lower().partition(":")[0],
+        "article_slug": article_id.lower(),
+    }
+
+
+def bound_template(department, templates=None):
+    """The department's template with its department values filled in"""
+    templates = templates or default_templates()
+    return templates.bound(department_slug(department), department_context(department))
+
+
+def generate_article_content(article_id, title, department, templates=None):
+    """Generate INT-specific article content from the department's template"""
+    return bound_template(department, templates).render(article_context(article_id, title))
+
+
+def build_article(department, article_info, templates=None):
+    """Build the full KB record for one catalogue entry.
+
+    Entry values for any of kb_build.ingest.OVERRIDE_FIELDS (e.g. a
+    hand-written ``content``) replace the generated ones.
+    """
+    if "content" in article_info:
+        content = article_info["content"]
+    else:
+        content = generate_article_content(
+            article_info["id"], article_info["title"], department, templates
+        )
+    article = {
+        "id": article_info["id"],
+        "article_id": article_info["id"],
+        "title": article_info["title"],
+        "category": department,
+        "department": department_slug(department),
+        "tags": article_info["tags"],
+        "summary": article_info["summary"],
+        "author": "INT Inc. " + department + " Team",
+        "read_time": article_info["read_time"],
+        "content": content,
+        "last_updated": "2025-01-15",
+        "popularity_score": 85,
+        "helpful_votes": 120,
+        "unhelpful_votes": 5,
+        "view_count": 980,
+        "url": f"/kb/{article_info['id'].lower().replace('_', '-')}"
+    }
+    for field in OVERRIDE_FIELDS:
+        if field in article_info:
+            article[field] = article_info[field]
+    if "related" in article_info:
+        article["related"] = article_info["related"]
+    return article
+
+
+def iter_articles(catalog=None, templates=None):
+    """Yield built articles one at a time, in catalogue order"""
+    catalog = load_catalog() if catalog is None else catalog
+    for department, articles in catalog.items():
+        for article_info in articles:
+            yield build_article(department, article_info, templates)
+
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _rendered(article_id):
+    return build_article(*find_entry(article_id))
+
+
+def render(article_id):
+    """The built record for one catalogue article, rendered on first request.
+
+    Raises KeyError for an unknown id. Returns a fresh copy each call, its
+    ``tags`` and ``related`` lists included, so callers may change it
+    without affecting later calls.
+    """
+    record = dict(_rendered(article_id))
+    record["tags"] = list(record["tags"])
+    if "related" in record:
+        record["related"] = list(record["related"])
+    return record
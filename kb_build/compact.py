@@ -0,0 +1,387 @@
+"""
+Compact columnar KB format with a memory-mapped reader
+
+A binary alternative to the pretty-printed JSON output for tooling that
+reads the KB repeatedly (analytics jobs, offline triage replays). Repeated
+values are interned, numbers are fixed-width columns and an id index allows
+fetching one article without touching the others.
+
+File layout (all integers little-endian)::
+
+    header        HEADER struct, see below
+    heap          UTF-8 text of every per-article string field, back to back
+    list pool     u32 items for tag lists (string ids) and related lists
+                  (article positions)
+    strings       interned string table: u32 count, u64 offsets[count + 1],
+                  UTF-8 blob
+    columns       one contiguous array per field in SCHEMA order, n items each
+    id index      (u64 id hash, u32 position) pairs sorted by hash
+
+Column item types:
+
+    text      <QI   heap offset, byte length
+    interned  <I    string table id
+    list      <II   list pool offset (items), item count
+    u32       <I
+    f64       <d
+    flags     <I    FLAG_* bits
+
+``article_id`` (when equal to ``id``) and ``url`` (when it is the default
+``/kb/<id>`` path) are not stored, only flagged. Any other record field is
+kept in the ``extra`` text column as JSON, so every record round-trips.
+"""
+
+import hashlib
+import json
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+from .manifest import atomic_open
+
+MAGIC = b"KBC1"
+FORMAT_VERSION = 1
+
+# magic, version, reserved, article count,
+# heap, pool, strings, columns and index section offsets
+HEADER = struct.Struct("<4sHHIQQQQQ")
+
+TEXT = struct.Struct("<QI")
+LIST = struct.Struct("<II")
+INDEX_ENTRY = struct.Struct("<QI")
+
+FLAG_ARTICLE_ID = 1 << 0  # article_id equals id
+FLAG_DEFAULT_URL = 1 << 1  # url is default_url(id)
+FLAG_RELATED = 1 << 2  # record has a related list
+FLAG_EXTRA = 1 << 3  # extra column holds JSON for other fields
+
+# (field, kind) in column order
+SCHEMA = (
+    ("id", "text"),
+    ("title", "text"),
+    ("category", "interned"),
+    ("department", "interned"),
+    ("tags", "tags"),
+    ("summary", "text"),
+    ("author", "interned"),
+    ("read_time", "interned"),
+    ("content", "text"),
+    ("last_updated", "interned"),
+    ("popularity_score", "f64"),
+    ("helpful_votes", "u32"),
+    ("unhelpful_votes", "u32"),
+    ("view_count", "u32"),
+    ("url", "text"),
+    ("related", "related"),
+    ("extra", "text"),
+    ("flags", "flags"),
+)
+
+_ITEM = {
+    "text": TEXT,
+    "interned": struct.Struct("<I"),
+    "tags": LIST,
+    "related": LIST,
+    "u32": struct.Struct("<I"),
+    "f64": struct.Struct("<d"),
+    "flags": struct.Struct("<I"),
+}
+
+# Fields stored outside their own column, or derived from others
+_SPECIAL = {"article_id", "url", "related"}
+_KNOWN = {field for field, _ in SCHEMA} | _SPECIAL
+
+
+class CompactFormatError(ValueError):
+    """Raised for files that are not a readable compact KB"""
+
+
+def default_url(article_id):
+    return f"/kb/{article_id.lower().replace('_', '-')}"
+
+
+def id_hash(article_id):
+    digest = hashlib.blake2b(article_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def write_compact(articles, path):
+    """Stream articles into a compact KB file at path. Returns the count.
+
+    Text fields go straight to disk; only fixed-width column values, list
+    items and the interned strings are held in memory until the end.
+    """
+    strings = {}
+    pool = array("I")
+    columns = {field: bytearray() for field, _ in SCHEMA}
+    positions = {}
+    related_ids = []
+    hashes = []
+
+    def intern(value):
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    with atomic_open(path, binary=True) as fp:
+        fp.write(b"\0" * HEADER.size)
+        heap_offset = fp.tell()
+        heap_size = 0
+
+        def put_text(text):
+            nonlocal heap_size
+            data = text.encode("utf-8")
+            fp.write(data)
+            heap_size += len(data)
+            return TEXT.pack(heap_size - len(data), len(data))
+
+        for position, article in enumerate(articles):
+            article_id = article["id"]
+            positions[article_id] = position
+            hashes.append((id_hash(article_id), position))
+
+            flags = 0
+            if article.get("article_id", article_id) == article_id:
+                flags |= FLAG_ARTICLE_ID
+            if article["url"] == default_url(article_id):
+                flags |= FLAG_DEFAULT_URL
+            if "related" in article:
+                flags |= FLAG_RELATED
+                related_ids.append((position, article["related"]))
+            extra = {key: value for key, value in article.items() if key not in _KNOWN}
+            if not flags & FLAG_ARTICLE_ID:
+                extra["article_id"] = article["article_id"]
+            if extra:
+                flags |= FLAG_EXTRA
+
+            for field, kind in SCHEMA:
+                column = columns[field]
+                if kind == "text":
+                    if field == "url" and flags & FLAG_DEFAULT_URL:
+                        column += TEXT.pack(0, 0)
+                    elif field == "extra":
+                        column += put_text(json.dumps(extra)) if extra else TEXT.pack(0, 0)
+                    else:
+                        column += put_text(article[field])
+                elif kind == "interned":
+                    column += _ITEM[kind].pack(intern(article[field]))
+                elif kind == "tags":
+                    column += LIST.pack(len(pool), len(article[field]))
+                    pool.extend(intern(tag) for tag in article[field])
+                elif kind == "related":
+                    column += LIST.pack(0, 0)  # filled in once all ids are known
+                elif kind == "flags":
+                    column += _ITEM[kind].pack(flags)
+                else:
+                    column += _ITEM[kind].pack(article[field])
+
+        # Related lists can point forward, so resolve them after the pass
+        related_column = columns["related"]
+        for position, ids in related_ids:
+            refs = [positions[i] for i in ids if i in positions]
+            LIST.pack_into(related_column, position * LIST.size, len(pool), len(refs))
+            pool.extend(refs)
+
+        pool_offset = fp.tell()
+        if sys.byteorder == "big":
+            pool.byteswap()
+        fp.write(pool.tobytes())
+
+        strings_offset = fp.tell()
+        encoded = [value.encode("utf-8") for value in strings]
+        offsets = [0]
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        fp.write(struct.pack("<I", len(encoded)))
+        fp.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        fp.write(b"".join(encoded))
+
+        columns_offset = fp.tell()
+        for field, _ in SCHEMA:
+            fp.write(columns[field])
+
+        index_offset = fp.tell()
+        for entry in sorted(hashes):
+            fp.write(INDEX_ENTRY.pack(*entry))
+
+        fp.seek(0)
+        fp.write(HEADER.pack(
+            MAGIC, FORMAT_VERSION, 0, len(positions),
+            heap_offset, pool_offset, strings_offset, columns_offset, index_offset,
+        ))
+    return len(positions)
+
+
+class CompactKB:
+    """Memory-mapped reader for a compact KB file.
+
+    Only the header and interned string table are decoded on open; articles
+    are decoded from the mapped columns on access::
+
+        with CompactKB("kb.kbc") as kb:
+            article = kb["KB-TECH-001"]
+            views = kb.column("view_count")
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise CompactFormatError(f"{path}: empty file") from None
+
+        try:
+            (magic, version, _, count, self._heap, self._pool, strings_offset,
+             columns_offset, self._index) = HEADER.unpack_from(self._map, 0)
+        except struct.error:
+            self.close()
+            raise CompactFormatError(f"{path}: truncated header") from None
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise CompactFormatError(f"{path}: not a compact KB v{FORMAT_VERSION} file")
+
+        self._count = count
+        self._strings = self._read_strings(strings_offset)
+        self._columns = {}
+        offset = columns_offset
+        for field, kind in SCHEMA:
+            self._columns[field] = (offset, _ITEM[kind])
+            offset += _ITEM[kind].size * count
+
+    def _read_strings(self, offset):
+        (count,) = struct.unpack_from("<I", self._map, offset)
+        offsets = struct.unpack_from(f"<{count + 1}Q", self._map, offset + 4)
+        blob = offset + 4 + 8 * (count + 1)
+        return [
+            self._map[blob + start:blob + end].decode("utf-8")
+            for start, end in zip(offsets, offsets[1:])
+        ]
+
+    def close(self):
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def _value(self, field, position):
+        offset, item = self._columns[field]
+        return item.unpack_from(self._map, offset + item.size * position)
+
+    def _text(self, field, position):
+        start, length = self._value(field, position)
+        return self._map[self._heap + start:self._heap + start + length].decode("utf-8")
+
+    def _list(self, field, position):
+        start, length = self._value(field, position)
+        return struct.unpack_from(f"<{length}I", self._map, self._pool + 4 * start)
+
+    def position(self, article_id):
+        """Position of an article, found by binary search on the id index"""
+        target = id_hash(article_id)
+        size = INDEX_ENTRY.size
+        hashes = _IndexKeys(self._map, self._index, self._count)
+        slot = bisect_left(hashes, target)
+        while slot < self._count:
+            found, position = INDEX_ENTRY.unpack_from(self._map, self._index + slot * size)
+            if found != target:
+                break
+            if self._text("id", position) == article_id:
+                return position
+            slot += 1
+        raise KeyError(article_id)
+
+    def article(self, position):
+        """Decode the record at a position into the generator's dict layout"""
+        if not 0 <= position < self._count:
+            raise IndexError(position)
+        (flags,) = self._value("flags", position)
+        article_id = self._text("id", position)
+        strings = self._strings
+
+        record = {"id": article_id}
+        if flags & FLAG_ARTICLE_ID:
+            record["article_id"] = article_id
+        for field, kind in SCHEMA[1:]:
+            if kind == "text" and field not in ("url", "extra"):
+                record[field] = self._text(field, position)
+            elif kind == "interned":
+                record[field] = strings[self._value(field, position)[0]]
+            elif kind == "tags":
+                record[field] = [strings[i] for i in self._list(field, position)]
+            elif kind in ("u32", "f64"):
+                value = self._value(field, position)[0]
+                record[field] = int(value) if kind == "f64" and value.is_integer() else value
+        record["url"] = (
+            default_url(article_id) if flags & FLAG_DEFAULT_URL else self._text("url", position)
+        )
+        if flags & FLAG_RELATED:
+            record["related"] = [self._text("id", p) for p in self._list("related", position)]
+        if flags & FLAG_EXTRA:
+            record.update(json.loads(self._text("extra", position)))
+        return record
+
+    def get(self, article_id, default=None):
+        try:
+            return self[article_id]
+        except KeyError:
+            return default
+
+    def __getitem__(self, article_id):
+        return self.article(self.position(article_id))
+
+    def __contains__(self, article_id):
+        try:
+            self.position(article_id)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        for position in range(self._count):
+            yield self.article(position)
+
+    def column(self, field):
+        """Zero-copy view of a u32 or f64 column, e.g. for analytics scans.
+
+        Release the view before calling close(); a mapped file cannot be
+        closed while views into it are alive.
+        """
+        kind = dict(SCHEMA).get(field)
+        if kind not in ("u32", "f64"):
+            raise ValueError(f"'{field}' is not a numeric column")
+        offset, item = self._columns[field]
+        view = memoryview(self._map)[offset:offset + item.size * self._count]
+        code = "I" if kind == "u32" else "d"
+        if sys.byteorder == "little":
+            return view.cast(code)
+        values = array(code, view)
+        values.byteswap()
+        return values
+
+
+class _IndexKeys:
+    """Sequence view of the id hashes in the index, for bisect"""
+
+    def __init__(self, buffer, offset, count):
+        self._buffer = buffer
+        self._offset = offset
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, slot):
+        return INDEX_ENTRY.unpack_from(self._buffer, self._offset + slot * INDEX_ENTRY.size)[0]
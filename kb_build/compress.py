@@ -0,0 +1,99 @@
+"""
+Precompressed siblings and size budgets for served KB artifacts
+
+Static hosts that support precompressed files (nginx ``gzip_static``,
+``express-static-gzip``, most CDNs) serve ``kb.json.gz`` in place of
+``kb.json`` to clients sending ``Accept-Encoding: gzip``, so the payload is
+compressed once at build time at the highest level instead of on every
+request.
+
+Compression is deterministic (no timestamp or file name in the gzip
+header), so an unchanged artifact always produces the same sibling and
+cache validators stay stable across builds.
+"""
+
+import gzip
+import os
+import shutil
+
+from .manifest import atomic_open
+
+GZIP_SUFFIX = ".gz"
+GZIP_LEVEL = 9
+
+
+def compressed_path(path):
+    return path + GZIP_SUFFIX
+
+
+def precompress(path, level=GZIP_LEVEL):
+    """Write path + ".gz" next to path and return its size in bytes.
+
+    The sibling is streamed and moved into place atomically. It is left
+    alone when it is already newer than path, so incremental builds that
+    did not rewrite an artifact do not rewrite its sibling either.
+    """
+    target = compressed_path(path)
+    try:
+        if os.stat(target).st_mtime_ns > os.stat(path).st_mtime_ns:
+            return os.path.getsize(target)
+    except FileNotFoundError:
+        pass
+
+    with open(path, "rb") as src, atomic_open(target, binary=True) as fp:
+        with gzip.GzipFile(filename="", mode="wb", compresslevel=level, fileobj=fp, mtime=0) as gz:
+            shutil.copyfileobj(src, gz, 1 << 20)
+    return os.path.getsize(target)
+
+
+class SizeReport:
+    """Raw and compressed sizes of every artifact a build wrote.
+
+    A budget applies to what a client downloads: the compressed size when a
+    sibling was written, the raw size otherwise.
+    """
+
+    def __init__(self):
+        # path -> (raw bytes, compressed bytes or None)
+        self.files = {}
+
+    def add(self, path, compress=False):
+        raw = os.path.getsize(path)
+        self.files[path] = (raw, precompress(path) if compress else None)
+
+    @staticmethod
+    def served(sizes):
+        raw, compressed = sizes
+        return raw if compressed is None else compressed
+
+    def over_budget(self, budget):
+        """Paths whose served size exceeds budget bytes, largest first"""
+        over = [path for path, sizes in self.files.items() if self.served(sizes) > budget]
+        return sorted(over, key=lambda path: -self.served(self.files[path]))
+
+    def to_dict(self):
+        return {
+            path: {"raw": raw, "gzip": compressed}
+            for path, (raw, compressed) in self.files.items()
+        }
+
+    def format(self):
+        """Plain-text table, one row per artifact plus a total"""
+        width = max([len(path) for path in self.files] + [len("total")])
+        lines = [f"{'artifact':<{width}}  {'raw':>10}  {'gzip':>10}  ratio"]
+        total_raw = total_served = 0
+        for path, (raw, compressed) in self.files.items():
+            total_raw += raw
+            total_served += self.served((raw, compressed))
+            if compressed is None:
+                lines.append(f"{path:<{width}}  {raw:>10}  {'-':>10}      -")
+            else:
+                lines.append(f"{path:<{width}}  {raw:>10}  {compressed:>10}  {_ratio(compressed, raw)}")
+        lines.append(
+            f"{'total':<{width}}  {total_raw:>10}  {total_served:>10}  {_ratio(total_served, total_raw)}"
+        )
+        return "\n".join(lines)
+
+
+def _ratio(part, whole):
+    return f"{part / whole:5.1%}" if whole else "    -"
@@ -0,0 +1,275 @@
+"""
+Near-duplicate article detection with MinHash and LSH banding
+
+Each body is reduced to its set of shingles (word 5-grams within a line, or
+the whole line when it is shorter) and summarised by a MinHash signature.
+Signatures use one-permutation hashing: every shingle is hashed once, the top
+bits pick one of SIGNATURE_SIZE bins and each bin keeps its minimum, with
+empty bins filled from their right neighbour (densification). This costs one
+sort of the shingle hashes instead of one pass per hash function and
+estimates Jaccard similarity like classic MinHash.
+
+Shingles are hashed per line and cached, so the lines that templated bodies
+share are only hashed once per build.
+
+The bins of a union are the per-bin minimum of its parts' bins, taken
+before densification. TemplateSigner uses this for bodies rendered from
+one template. The lines that are static in every rendered body are
+binned once per template. Each article then hashes only the lines that
+hold a slot value, folds them into a copy of the static bins and
+densifies. The signature is the same as signature() of the rendered body.
+
+Signatures are split into ``bands`` bands of ``rows`` values. Articles that
+agree on a whole band share a bucket and become candidates; candidates are
+only compared with the first article of each bucket, and matches at or above
+the similarity threshold are joined into clusters. Time and memory grow
+linearly with the catalogue even when most articles are near-identical.
+
+Since only bucket-first articles are ever compared against, only their
+signatures are kept, packed as ``array('Q')``; buckets are keyed by the raw
+bytes of the band. Bodies are consumed one at a time and not held, and
+bodies with the same key (a digest of the body) are joined without
+computing a signature.
+
+Hashing uses CRC-32 and a fixed multiplier, so clusters are the same on
+every run and platform.
+"""
+
+import hashlib
+import operator
+import re
+import zlib
+from array import array
+from functools import lru_cache, partial
+from itertools import repeat
+
+from .templates import TemplateError
+
+SHINGLE_SIZE = 5
+SIGNATURE_SIZE = 128
+DEFAULT_BANDS = 16
+DEFAULT_THRESHOLD = 0.8
+LINE_CACHE_SIZE = 1 << 16
+
+_BIN_BITS = SIGNATURE_SIZE.bit_length() - 1
+_VALUE_BITS = 64 - _BIN_BITS
+_MASK = (1 << 64) - 1
+_MIX = 0x9E3779B97F4A7C15
+_EMPTY = 1 << 64  # above every hash: marks an empty bin
+
+_WORD = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=LINE_CACHE_SIZE)
+def _line_shingles(line):
+    words = _WORD.findall(line.lower())
+    if len(words) <= SHINGLE_SIZE:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = map(" ".join, zip(*(words[i:] for i in range(SHINGLE_SIZE))))
+    return frozenset([(zlib.crc32(gram.encode("utf-8")) * _MIX) & _MASK for gram in grams])
+
+
+def shingle_hashes(text):
+    """Set of 64-bit shingle hashes of text"""
+    return set().union(*map(_line_shingles, text.splitlines()))
+
+
+def bin_minima(hashes):
+    """Per-bin minimum of shingle hashes before densification.
+
+    A list of SIGNATURE_SIZE ints, with _EMPTY for bins no hash fell in.
+    """
+    # Walking the hashes from largest to smallest leaves each bin's minimum
+    lowest = {value >> _VALUE_BITS: value for value in sorted(hashes, reverse=True)}
+    return list(map(lowest.get, range(SIGNATURE_SIZE), repeat(_EMPTY)))
+
+
+def signature(text):
+    """One-permutation MinHash signature of text, a tuple of SIGNATURE_SIZE ints.
+
+    Returns None for text without any words, which has no shingles to
+    compare.
+    """
+    return densify(bin_minima(shingle_hashes(text)))
+
+
+def densify(bins):
+    """Signature of bin minima (see bin_minima()), or None when every bin is empty"""
+    if _EMPTY not in bins:
+        return tuple(bins)
+    if bins.count(_EMPTY) == SIGNATURE_SIZE:
+        return None
+    # An empty bin borrows the next filled bin's value, offset by the
+    # distance so that borrowed values stay distinct per position
+    signature = list(bins)
+    slot = -1
+    for _ in range(bins.count(_EMPTY)):
+        slot = bins.index(_EMPTY, slot + 1)
+        distance = 1
+        while bins[(slot + distance) % SIGNATURE_SIZE] == _EMPTY:
+            distance += 1
+        signature[slot] = (bins[(slot + distance) % SIGNATURE_SIZE] + distance * _MIX) & _MASK
+    return tuple(signature)
+
+
+def body_key(text):
+    """Digest identifying a body; equal keys mean identical bodies"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class TemplateSigner:
+    """Signatures of bodies rendered from one kb_build.templates.Template.
+
+    The static lines between slots are binned once; sign() hashes only the
+    lines holding slot values.
+    """
+
+    def __init__(self, template):
+        self.template = template
+        self.prefix = template.digest.encode("ascii") + b"\0"
+        static = []
+        pieces = []
+        last = len(template.segments) - 1
+        for index, segment in enumerate(template.segments):
+            # Only a segment's first line (after a slot) and last line
+            # (before a slot) can share a line with a slot value
+            lines = segment.splitlines(keepends=True)
+            head, tail = int(index > 0), len(lines) - (index < last)
+            if head < tail:
+                static.extend(lines[head:tail])
+                segment = "".join(lines[:head] + lines[tail:])
+            pieces.append(segment)
+        # static segments at even positions, slot values at odd positions
+        self._pieces = [""] * (2 * len(pieces) - 1)
+        self._pieces[::2] = pieces
+        self._positions = tuple(
+            (2 * i + 1, slot) for i, slot in enumerate(template.slot_order)
+        )
+        self.static = bin_minima(shingle_hashes("".join(static)))
+
+    def sign(self, context):
+        """(key, sign) for the body template.render(context) would produce.
+
+        sign() returns the body's signature; find_similar() only calls it for
+        keys it has not seen.
+        """
+        pieces = self._pieces.copy()
+        try:
+            for position, slot in self._positions:
+                pieces[position] = context[slot]
+        except KeyError as error:
+            raise TemplateError(f"{self.template.name}: missing value for slot {error}") from None
+        text = "".join(pieces)
+        key = hashlib.blake2b(self.prefix + text.encode("utf-8"), digest_size=16).digest()
+
+        def sign():
+            # A few dozen hashes: folding them in beats binning them first
+            bins = self.static.copy()
+            for line in text.splitlines():
+                for value in _line_shingles(line):
+                    slot = value >> _VALUE_BITS
+                    if value < bins[slot]:
+                        bins[slot] = value
+            return densify(bins)
+
+        return key, sign
+
+
+def similarity(left, right):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(map(operator.eq, left, right)) / SIGNATURE_SIZE
+
+
+class _Clusters:
+    """Union-find over article positions that keeps the smallest position as root"""
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, position):
+        root = position
+        while self.parent.get(root, root) != root:
+            root = self.parent[root]
+        while position != root:
+            self.parent[position], position = root, self.parent.get(position, position)
+        return root
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+
+def find_duplicates(bodies, threshold=DEFAULT_THRESHOLD, bands=DEFAULT_BANDS, cache=None):
+    """Near-duplicate clusters among bodies, an iterable of (id, text).
+
+    Returns a list of clusters, each a list of ids in input order with the
+    first id as the one to keep. Articles without near-duplicates are left
+    out. Bodies without any words only match identical bodies.
+
+    ``cache`` is an optional dict of signatures keyed by body key, kept by
+    the caller between runs (``--watch``) so unchanged bodies are not
+    hashed again. It is left holding only the bodies of this run.
+    """
+    signed = (
+        (article_id, body_key(text), partial(signature, text)) for article_id, text in bodies
+    )
+    return find_similar(signed, threshold, bands, cache)
+
+
+def find_similar(signed, threshold=DEFAULT_THRESHOLD, bands=DEFAULT_BANDS, cache=None):
+    """Near-duplicate clusters among signed, an iterable of (id, key, sign).
+
+    key identifies the body (see body_key() and TemplateSigner.sign()) and
+    sign() returns its signature; it is only called for keys not seen
+    before in this run or found in ``cache``. Returns clusters as
+    find_duplicates() does.
+    """
+    if SIGNATURE_SIZE % bands:
+        raise ValueError(f"bands must divide {SIGNATURE_SIZE}, got {bands}")
+    width = SIGNATURE_SIZE // bands * 8
+    spans = [slice(start, start + width) for start in range(0, SIGNATURE_SIZE * 8, width)]
+
+    ids = []
+    signatures = {}  # position -> signature, for bucket-first positions only
+    first = [{} for _ in range(bands)]  # per band: band bytes -> first position seen
+    exact = {}  # body key -> first position, skips hashing repeated bodies
+    clusters = _Clusters()
+    for position, (article_id, key, sign) in enumerate(signed):
+        ids.append(article_id)
+        same = exact.setdefault(key, position)
+        if same != position:
+            clusters.union(same, position)
+            continue
+        if cache is not None and key in cache:
+            sig = cache[key]
+        else:
+            sig = sign()
+            if sig is not None:
+                sig = array("Q", sig)
+            if cache is not None:
+                cache[key] = sig
+        if sig is None:
+            continue
+        packed = sig.tobytes()
+        others = dict.fromkeys(
+            map(dict.setdefault, first, map(packed.__getitem__, spans), repeat(position))
+        )
+        if others.pop(position, False) is None:
+            signatures[position] = sig
+        root = position
+        for other in others:
+            if clusters.find(other) != root and similarity(sig, signatures[other]) >= threshold:
+                clusters.union(other, position)
+                root = clusters.find(position)
+
+    _line_shingles.cache_clear()
+    if cache is not None:
+        for key in cache.keys() - exact.keys():
+            del cache[key]
+
+    members = {}
+    for position in range(len(ids)):
+        members.setdefault(clusters.find(position), []).append(ids[position])
+    return [cluster for cluster in members.values() if len(cluster) > 1]
@@ -0,0 +1,241 @@
+"""
+Tolerant ingestion of hand-written KB article files
+
+Two legacy files hold article data the generator's catalogue lacks:
+
+- data/kb.json: full article records, some with ``content`` written as a JS
+  template literal in backticks (so the file is not valid JSON);
+- remaining_kb_batch.json: partial records (id, title, category and a
+  ``content_summary``) for articles still to be written.
+
+iter_records() reads either file as a stream of top-level array elements,
+converting backtick literals to JSON strings on the fly, and only holds one
+record at a time. normalize() maps a record to a catalogue entry and
+merge_catalog() folds entries into a catalogue by id.
+
+Catalogue entries may carry any of OVERRIDE_FIELDS; build_article() uses
+those values instead of its defaults, so a hand-written ``content`` replaces
+the templated body. A record's ``category`` picks its catalogue department;
+its ``department`` slug is ignored and derived from the category like every
+other article's.
+
+normalize() checks field values against the record schema: null fields are
+dropped so the defaults apply, whole numbers written as floats or strings
+become ints, and any other value of the wrong type is an IngestError naming
+the record.
+"""
+
+import json
+import re
+
+CHUNK_SIZE = 1 << 16
+
+# Record fields a catalogue entry may set in place of the generated value
+OVERRIDE_FIELDS = (
+    "author",
+    "content",
+    "last_updated",
+    "popularity_score",
+    "helpful_votes",
+    "unhelpful_votes",
+    "view_count",
+    "url",
+)
+ENTRY_FIELDS = ("title", "tags", "summary", "read_time") + OVERRIDE_FIELDS
+
+# Field types of the generator's record schema
+TEXT_FIELDS = frozenset({"title", "summary", "read_time", "author", "content", "last_updated", "url"})
+COUNT_FIELDS = frozenset({"helpful_votes", "unhelpful_votes", "view_count"})
+SCORE_FIELDS = frozenset({"popularity_score"})
+
+# Defaults for entries that only exist in an ingested file
+NEW_ENTRY_DEFAULTS = {"tags": [], "summary": "", "read_time": "5 min read"}
+
+_TOKEN = re.compile(
+    r'"(?:[^"\\]|\\.)*"'  # JSON string
+    r"|`(?:[^`\\]|\\.)*`"  # JS template literal
+    r'|[^"`]+',  # structure between strings
+    re.DOTALL,
+)
+_BRACKET = re.compile(r"[{}\[\]]")
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_TEMPLATE_ESCAPE = re.compile(r"\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|\r\n|.)", re.DOTALL)
+_SIMPLE_ESCAPES = {
+    "n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "0": "\0",
+    "\n": "", "\r": "", "\r\n": "", "\u2028": "", "\u2029": "",
+}
+
+
+class IngestError(ValueError):
+    """Raised for an article file that cannot be read as a list of records"""
+
+
+def _unescape(match):
+    escape = match.group(1)
+    if escape in _SIMPLE_ESCAPES:
+        return _SIMPLE_ESCAPES[escape]
+    if escape.startswith("u{"):
+        return chr(int(escape[2:-1], 16))
+    if escape[0] in "ux" and len(escape) > 1:
+        return chr(int(escape[1:], 16))
+    return escape
+
+
+def template_literal_value(literal):
+    """Cooked string value of a JS template literal, backticks included.
+
+    ``${...}`` placeholders cannot be evaluated here and are kept verbatim.
+    """
+    body = literal[1:-1].replace("\r\n", "\n").replace("\r", "\n")
+    return _TEMPLATE_ESCAPE.sub(_unescape, body)
+
+
+def iter_records(fp, name="<stream>"):
+    """Yield each object of the top-level array in a JSON-like text stream.
+
+    Accepts backtick template literals wherever a string is expected and
+    trailing commas before ``}`` or ``]``.
+    """
+    buffer = ""
+    eof = False
+    depth = 0
+    line = 1
+    record = []
+
+    def fail(message):
+        raise IngestError(f"{name}:{line}: {message}")
+
+    while True:
+        position = 0
+        for match in _TOKEN.finditer(buffer):
+            # A gap is a string with no closing quote yet; a token touching the
+            # end of the buffer may continue in the next chunk
+            if match.start() != position or (match.end() == len(buffer) and not eof):
+                break
+            token = match.group()
+            position = match.end()
+            if token[0] == '"' or token[0] == "`":
+                if depth < 2:
+                    fail("expected an array of objects")
+                record.append(json.dumps(template_literal_value(token)) if token[0] == "`" else token)
+                line += token.count("\n")
+                continue
+
+            token = _TRAILING_COMMA.sub(r"\1", token)
+            start = 0
+            for bracket in _BRACKET.finditer(token):
+                char = bracket.group()
+                if depth == 0:
+                    if char != "[":
+                        fail("expected an array of objects")
+                elif depth == 1 and char == "{":
+                    start = bracket.start()
+                    record = []
+                depth += 1 if char in "{[" else -1
+                if depth < 0:
+                    fail(f"unbalanced '{char}'")
+                if depth == 1 and char == "}":
+                    record.append(token[start:bracket.end()])
+                    try:
+                        yield json.loads("".join(record))
+                    except ValueError as error:
+                        fail(f"invalid record: {error}")
+                    record = []
+            if depth > 1:
+                record.append(token[start:])
+            line += token.count("\n")
+        buffer = buffer[position:]
+
+        if eof:
+            break
+        chunk = fp.read(CHUNK_SIZE)
+        eof = not chunk
+        buffer += chunk
+
+    if buffer[:1] in ('"', "`"):
+        fail("unterminated string")
+    if buffer.strip() or depth:
+        fail("unexpected end of file")
+
+
+def read_records(path):
+    """iter_records() over the file at path"""
+    with open(path, encoding="utf-8") as fp:
+        yield from iter_records(fp, path)
+
+
+def _number(value, field):
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            raise ValueError(f"{field} must be a number, got {value!r}") from None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value:
+        raise ValueError(f"{field} must be a number, got {value!r}")
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def field_value(field, value):
+    """value checked against, or coerced to, the record schema type of field"""
+    if field in TEXT_FIELDS:
+        if not isinstance(value, str):
+            raise ValueError(f"{field} must be a string, got {value!r}")
+    elif field in COUNT_FIELDS:
+        value = _number(value, field)
+        if not isinstance(value, int) or not 0 <= value < 1 << 32:
+            raise ValueError(f"{field} must be a whole number from 0 to 2^32-1, got {value!r}")
+    elif field in SCORE_FIELDS:
+        value = _number(value, field)
+    elif field == "tags":
+        if not isinstance(value, list) or not all(isinstance(tag, str) for tag in value):
+            raise ValueError(f"tags must be a list of strings, got {value!r}")
+    return value
+
+
+def normalize(record):
+    """Map a full or partial article record to (category, catalogue entry)"""
+    try:
+        category = record["category"]
+        entry = {"id": record["id"]}
+    except (KeyError, TypeError):
+        raise IngestError(f"record needs an 'id' and a 'category': {str(record)[:80]}") from None
+    if not isinstance(entry["id"], str) or not isinstance(category, str):
+        raise IngestError(f"'id' and 'category' must be strings: {str(record)[:80]}")
+    fields = {field: record.get(field) for field in ENTRY_FIELDS}
+    if fields["summary"] is None:
+        fields["summary"] = record.get("content_summary")
+    for field, value in fields.items():
+        if value is not None:
+            try:
+                entry[field] = field_value(field, value)
+            except ValueError as error:
+                raise IngestError(f"{entry['id']}: {error}") from None
+    return category, entry
+
+
+def merge_catalog(catalog, records):
+    """Copy of catalog with normalized records merged in by id.
+
+    Fields from records replace the catalogue's; later records win over
+    earlier ones. Articles not in the catalogue are appended to their
+    category, which is created if needed. Those need a ``content`` unless
+    the category is already in the catalogue, because the body template's
+    department values are only defined for existing departments.
+    """
+    merged = {category: [dict(entry) for entry in entries] for category, entries in catalog.items()}
+    by_id = {entry["id"]: entry for entries in merged.values() for entry in entries}
+    for category, entry in records:
+        existing = by_id.get(entry["id"])
+        if existing is not None:
+            existing.update(entry)
+            continue
+        if category not in catalog and "content" not in entry:
+            raise IngestError(
+                f"{entry['id']}: new category '{category}' needs hand-written content"
+            )
+        entry = {**NEW_ENTRY_DEFAULTS, **entry}
+        merged.setdefault(category, []).append(entry)
+        by_id[entry["id"]] = entry
+    return merged
@@ -0,0 +1,149 @@
+"""
+Content-addressed build manifest for incremental KB builds
+
+The manifest sits next to the generated output and records, for every
+article, a digest of its inputs (catalogue entry, department values and
+template), a digest of its encoded output and the byte span it occupies in
+the output file. A rerun only re-renders articles whose input digest changed
+and copies every other span straight from the previous output.
+
+The manifest also records a digest of the whole output file. If anything
+else rewrote the output since (e.g. a build without --incremental), the
+spans no longer describe it and the manifest is ignored.
+"""
+
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+
+MANIFEST_VERSION = 2
+FILE_CHUNK = 1 << 20
+
+
+def text_digest(text):
+    """Short stable digest of a string"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def file_digest(path):
+    """Short stable digest of a file's bytes"""
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(FILE_CHUNK), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def digest(value):
+    """Digest of a JSON-serializable value, independent of key order"""
+    return text_digest(json.dumps(value, sort_keys=True, separators=(",", ":")))
+
+
+def manifest_path_for(output):
+    return output + ".manifest.json"
+
+
+@contextmanager
+def atomic_open(path, binary=False):
+    """Open a temporary sibling of path for writing; move it into place on exit.
+
+    Readers never observe a half-written file. If the block raises, the
+    temporary file is removed and path is left untouched.
+    """
+    tmp = f"{path}.tmp-{os.getpid()}"
+    try:
+        with (open(tmp, "wb") if binary else open(tmp, "w", encoding="utf-8")) as fp:
+            yield fp
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def write_atomic(path, write):
+    """Call write(fp) on an atomic_open() file and return its result"""
+    with atomic_open(path) as fp:
+        return write(fp)
+
+
+class BuildManifest:
+    """Per-article digests and output spans from the previous build"""
+
+    def __init__(self, fmt, generator, articles=None, size=None, output_digest=None):
+        self.fmt = fmt
+        self.generator = generator
+        # article id -> {"input", "output", "offset", "length"}
+        self.articles = articles if articles is not None else {}
+        self.size = size
+        self.output_digest = output_digest
+
+    @classmethod
+    def load(cls, path):
+        """Return the manifest at path, or None if it is missing or unreadable"""
+        try:
+            with open(path, encoding="utf-8") as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        return cls(
+            data["format"], data["generator"], data["articles"], data.get("size"),
+            data.get("output_digest"),
+        )
+
+    def save(self, path):
+        data = {
+            "version": MANIFEST_VERSION,
+            "format": self.fmt,
+            "generator": self.generator,
+            "size": self.size,
+            "output_digest": self.output_digest,
+            "articles": self.articles,
+        }
+        write_atomic(path, lambda fp: json.dump(data, fp, separators=(",", ":")))
+
+    def matches(self, fmt, generator, output):
+        """True if spans in this manifest can be reused to rebuild output"""
+        try:
+            size = os.path.getsize(output)
+        except OSError:
+            return False
+        if self.fmt != fmt or self.generator != generator or self.size != size:
+            return False
+        return self.output_digest is not None and self.output_digest == file_digest(output)
+
+
+class ChangeSet:
+    """Articles added, changed, removed or left untouched by a build"""
+
+    def __init__(self):
+        self.added = []
+        self.changed = []
+        self.removed = []
+        self.unchanged = 0
+        self.rendered = 0
+        self.reordered = False
+
+    @property
+    def empty(self):
+        return not (self.added or self.changed or self.removed or self.reordered)
+
+    def summary(self):
+        return (
+            f"{len(self.added)} added, {len(self.changed)} changed, "
+            f"{len(self.removed)} removed, {self.unchanged} unchanged "
+            f"({self.rendered} rendered)"
+        )
+
+    def to_dict(self):
+        return {
+            "added": self.added,
+            "changed": self.changed,
+            "removed": self.removed,
+            "unchanged": self.unchanged,
+            "rendered": self.rendered,
+            "reordered": self.reordered,
+        }
@@ -0,0 +1,193 @@
+"""
+Article popularity from kb_searches / kb_feedback exports
+
+The app records usage in two tables (see
+supabase/migrations/20251015050000_add_advanced_features.sql):
+
+- ``kb_searches(query, result_count, searched_at)``. Article views land here
+  too: ``increment_article_views(article_id)`` inserts a row whose query is
+  the article id, so a row whose query is a catalogue id counts as a view.
+- ``kb_feedback(article_id, helpful, feedback_text, created_at)``, one row
+  per helpful / not helpful vote.
+
+Exports are read as CSV with a header row or as NDJSON, either one
+optionally gzipped, and each row is classified by its columns, so one file
+may hold either table. Rows are folded into per-article counters as they
+are read; memory depends on the catalogue size, not on the export size.
+Search rows for free-text queries are skipped without parsing their
+timestamps.
+
+The popularity score is an exponentially time-decayed sum of events: a view
+counts VIEW_WEIGHT, a helpful vote HELPFUL_WEIGHT and an unhelpful vote
+UNHELPFUL_WEIGHT, and an event loses half its weight every ``half_life``
+days before the newest event seen (or ``as_of``). Each article keeps its
+sum relative to its own newest event and rescales it when a newer one
+arrives, so rows may come in any order and the result does not depend on
+when the build runs. Scores are scaled so the top article gets 100.
+"""
+
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timezone
+
+HALF_LIFE_DAYS = 30.0
+VIEW_WEIGHT = 1.0
+HELPFUL_WEIGHT = 3.0
+UNHELPFUL_WEIGHT = -3.0
+MAX_SCORE = 100
+
+_TRUE = frozenset({"t", "true", "1", "yes"})
+_FALSE = frozenset({"f", "false", "0", "no"})
+
+# index into an article's counters
+_VIEWS, _HELPFUL, _UNHELPFUL, _DECAYED, _NEWEST = range(5)
+
+
+class ExportError(ValueError):
+    """Raised for an unreadable or malformed analytics export"""
+
+
+def _open_text(path):
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path), encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def iter_rows(path):
+    """Yield (line number, row dict) from a CSV or NDJSON export file"""
+    name = path[:-3] if path.endswith(".gz") else path
+    if name.endswith(".csv"):
+        with _open_text(path) as fp:
+            # csv.reader and zip() are about twice as fast as csv.DictReader
+            reader = csv.reader(fp)
+            header = next(reader, None)
+            for values in reader:
+                if values:
+                    yield reader.line_num, dict(zip(header, values))
+    elif name.endswith((".ndjson", ".jsonl")):
+        with _open_text(path) as fp:
+            for number, line in enumerate(fp, 1):
+                if line.strip():
+                    try:
+                        row = json.loads(line)
+                    except ValueError as error:
+                        raise ExportError(f"{path}:{number}: invalid JSON: {error}") from None
+                    yield number, row
+    else:
+        raise ExportError(f"{path}: expected a .csv or .ndjson export (optionally .gz)")
+
+
+def _timestamp(value):
+    """Seconds since the epoch of an exported timestamptz, or None"""
+    if not value:
+        return None
+    when = datetime.fromisoformat(value)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.timestamp()
+
+
+def _boolean(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError(f"expected a boolean, got {value!r}")
+
+
+class PopularityStats:
+    """Per-article view and vote counts with a time-decayed popularity score"""
+
+    def __init__(self, article_ids, half_life_days=HALF_LIFE_DAYS, as_of=None):
+        self.half_life = half_life_days * 86400
+        self.as_of = as_of
+        self.articles = {article_id: [0, 0, 0, 0.0, None] for article_id in article_ids}
+        self.rows = 0
+        self.skipped = 0
+        self.newest = None
+
+    def _fold(self, counters, weight, when):
+        """Add one event of weight at time when to an article's decayed sum"""
+        newest = counters[_NEWEST]
+        if when is None:
+            # Undated rows count as if they came with the article's newest event
+            counters[_DECAYED] += weight
+        elif newest is None or when > newest:
+            if newest is not None:
+                counters[_DECAYED] *= 2 ** ((newest - when) / self.half_life)
+            counters[_DECAYED] += weight
+            counters[_NEWEST] = when
+            if self.newest is None or when > self.newest:
+                self.newest = when
+        else:
+            counters[_DECAYED] += weight * 2 ** ((when - newest) / self.half_life)
+
+    def add_row(self, row):
+        """Count one kb_searches or kb_feedback row, classified by its columns"""
+        self.rows += 1
+        if "helpful" in row and "article_id" in row:
+            article_id = row["article_id"]
+            counters = self.articles.get(article_id)
+            if counters is None:
+                self.skipped += 1
+                return
+            helpful = _boolean(row["helpful"])
+            counters[_HELPFUL if helpful else _UNHELPFUL] += 1
+            weight = HELPFUL_WEIGHT if helpful else UNHELPFUL_WEIGHT
+            self._fold(counters, weight, _timestamp(row.get("created_at")))
+        elif "query" in row:
+            article_id = (row["query"] or "").strip()
+            counters = self.articles.get(article_id)
+            if counters is None:
+                self.skipped += 1
+                return
+            counters[_VIEWS] += 1
+            self._fold(counters, VIEW_WEIGHT, _timestamp(row.get("searched_at")))
+        else:
+            raise ValueError("neither a kb_searches nor a kb_feedback row")
+
+    def read(self, path):
+        """Stream one export file into the counters"""
+        for number, row in iter_rows(path):
+            try:
+                self.add_row(row)
+            except (ValueError, TypeError, AttributeError) as error:
+                raise ExportError(f"{path}:{number}: {error}") from None
+
+    def scores(self):
+        """{article_id: decayed score} as of ``as_of`` or the newest event"""
+        as_of = self.as_of if self.as_of is not None else self.newest
+        scores = {}
+        for article_id, counters in self.articles.items():
+            decayed, newest = counters[_DECAYED], counters[_NEWEST]
+            if newest is not None and as_of is not None:
+                decayed *= 2 ** ((newest - as_of) / self.half_life)
+            scores[article_id] = max(decayed, 0.0)
+        return scores
+
+    def fields(self):
+        """{article_id: {field: value}} of the popularity fields build_article() embeds"""
+        scores = self.scores()
+        top = max(scores.values(), default=0.0)
+        return {
+            article_id: {
+                "popularity_score": round(MAX_SCORE * scores[article_id] / top) if top else 0,
+                "helpful_votes": counters[_HELPFUL],
+                "unhelpful_votes": counters[_UNHELPFUL],
+                "view_count": counters[_VIEWS],
+            }
+            for article_id, counters in self.articles.items()
+        }
+
+
+def read_popularity(article_ids, paths, half_life_days=HALF_LIFE_DAYS, as_of=None):
+    """PopularityStats for article_ids built from every export in paths"""
+    stats = PopularityStats(article_ids, half_life_days, as_of)
+    for path in paths:
+        stats.read(path)
+    return stats
@@ -0,0 +1,125 @@
+"""
+Stage and per-article profiling for KB builds
+
+BuildProfiler records wall time, CPU time and the tracemalloc peak of each
+build stage and of each article it is asked to measure, then exports them
+as Chrome trace-event JSON (open in chrome://tracing or ui.perfetto.dev)::
+
+    {"traceEvents": [
+      {"name": "render", "cat": "stage", "ph": "X", "ts": 1200, "dur": 3400,
+       "pid": 1, "tid": 1, "args": {"cpu_ms": 3.3, "peak_bytes": 81920}},
+      {"name": "KB-TECH-001", "cat": "article", "ph": "X", ...}
+    ], "displayTimeUnit": "ms"}
+
+Timestamps are microseconds from profiler creation. Stages go on one
+track and articles on another. ``peak_bytes`` is the highest traced
+allocation above what was already allocated when the stage or article
+started. CPU time and allocations are this process's only, so work done in
+worker processes (``--workers N``) shows up as wall time alone.
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+STAGE_TRACK = 1
+ARTICLE_TRACK = 2
+DEFAULT_TOP = 10
+
+
+class BuildProfiler:
+    """Collects stage and article timings for one build"""
+
+    def __init__(self):
+        self.stages = []  # (name, start_us, wall_s, cpu_s, peak_bytes)
+        self.articles = []
+        self._origin = time.perf_counter()
+        self._owns_tracing = not tracemalloc.is_tracing()
+        if self._owns_tracing:
+            tracemalloc.start()
+
+    def close(self):
+        if self._owns_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _start(self):
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        return current, time.process_time(), time.perf_counter()
+
+    def _stop(self, mark):
+        """(start_us, wall_s, cpu_s, peak_bytes) since _start() returned mark"""
+        current, cpu, started = mark
+        wall = time.perf_counter() - started
+        cpu = time.process_time() - cpu
+        peak = max(tracemalloc.get_traced_memory()[1] - current, 0)
+        return (started - self._origin) * 1e6, wall, cpu, peak
+
+    @contextmanager
+    def stage(self, name):
+        """Measure the enclosed block as one build stage"""
+        mark = self._start()
+        try:
+            yield
+        finally:
+            self.stages.append((name,) + self._stop(mark))
+
+    def article(self, article_id, run):
+        """Call run(), record it as building article_id and return its result"""
+        mark = self._start()
+        try:
+            return run()
+        finally:
+            self.articles.append((article_id,) + self._stop(mark))
+
+    def slowest(self, n=DEFAULT_TOP):
+        """The n articles with the longest wall time, slowest first"""
+        return sorted(self.articles, key=lambda sample: -sample[2])[:n]
+
+    def trace(self):
+        """Chrome trace-event JSON object for everything recorded"""
+        pid = os.getpid()
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in ((STAGE_TRACK, "stages"), (ARTICLE_TRACK, "articles"))
+        ]
+        for category, tid, samples in (
+            ("stage", STAGE_TRACK, self.stages),
+            ("article", ARTICLE_TRACK, self.articles),
+        ):
+            for name, start_us, wall, cpu, peak in samples:
+                events.append({
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": round(start_us, 3),
+                    "dur": round(wall * 1e6, 3),
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"cpu_ms": round(cpu * 1e3, 3), "peak_bytes": peak},
+                })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_trace(self, fp):
+        json.dump(self.trace(), fp, separators=(",", ":"))
+
+    def format_stages(self):
+        """Plain-text table of the recorded stages"""
+        width = max([len(stage[0]) for stage in self.stages] + [len("stage")])
+        lines = [f"{'stage':<{width}}  {'wall ms':>10}  {'cpu ms':>10}  {'peak KiB':>10}"]
+        for name, _, wall, cpu, peak in self.stages:
+            lines.append(f"{name:<{width}}  {wall * 1e3:>10.2f}  {cpu * 1e3:>10.2f}  {peak / 1024:>10.1f}")
+        return "\n".join(lines)
+
+    def format_slowest(self, n=DEFAULT_TOP):
+        """Plain-text table of the n slowest articles"""
+        slowest = self.slowest(n)
+        width = max([len(sample[0]) for sample in slowest] + [len("article")])
+        lines = [f"{'article':<{width}}  {'wall ms':>10}  {'cpu ms':>10}  {'peak KiB':>10}"]
+        for article_id, _, wall, cpu, peak in slowest:
+            lines.append(
+                f"{article_id:<{width}}  {wall * 1e3:>10.3f}  {cpu * 1e3:>10.3f}  {peak / 1024:>10.1f}"
+            )
+        return "\n".join(lines)
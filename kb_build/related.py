@@ -0,0 +1,123 @@
+"""
+Precomputed related-articles graph
+
+Reproduces the ranking of ``KnowledgeBaseService.getRelatedArticles()`` in
+src/knowledgeBaseService.js for every article at build time: same category
+scores 3, same department 2, and each shared tag 1; articles scoring 0 are
+dropped and ties keep catalogue order.
+
+Instead of comparing all pairs:
+
+- articles with the same (category, department, tags) signature, such as
+  tenant variants of one article, rank identically, so ranking is done once
+  per signature class and shared by its members;
+- classes sharing a tag are found through a tag -> classes index and scored
+  exactly;
+- every other candidate only scores the category/department bonus, which is
+  the same for a whole (category, department) group, so each group is
+  scanned in catalogue order only until ``k`` better positions are known.
+"""
+
+import heapq
+from collections import defaultdict
+
+DEFAULT_RELATED = 5
+
+CATEGORY_SCORE = 3
+DEPARTMENT_SCORE = 2
+
+
+def _earliest(classes, members, k, skip):
+    """First k positions, in catalogue order, across classes not in skip.
+
+    classes is ordered by first member position, so the scan stops as soon
+    as the next class starts after the k-th position found so far.
+    """
+    best = []
+    for cls in classes:
+        if cls in skip:
+            continue
+        if len(best) == k and members[cls][0] > -best[0]:
+            break
+        for position in members[cls][:k]:
+            if len(best) < k:
+                heapq.heappush(best, -position)
+            elif position < -best[0]:
+                heapq.heapreplace(best, -position)
+            else:
+                break
+    return sorted(-p for p in best)
+
+
+def related_positions(records, k=DEFAULT_RELATED):
+    """Top-k related article positions for every record.
+
+    records is a sequence of ``(category, department, tags)`` tuples in
+    catalogue order. Returns a list of position lists, best first.
+    """
+    class_of = {}
+    signatures = []
+    members = []
+    for position, (category, department, tags) in enumerate(records):
+        signature = (category, department, tuple(tags or ()))
+        cls = class_of.get(signature)
+        if cls is None:
+            cls = class_of[signature] = len(signatures)
+            signatures.append(signature)
+            members.append([])
+        members[cls].append(position)
+
+    by_tag = defaultdict(list)
+    groups = defaultdict(list)
+    for cls, (category, department, tags) in enumerate(signatures):
+        for tag in set(tags):
+            by_tag[tag].append(cls)
+        groups[(category, department)].append(cls)
+    group_keys_by_category = defaultdict(list)
+    group_keys_by_department = defaultdict(list)
+    for category, department in groups:
+        group_keys_by_category[category].append((category, department))
+        group_keys_by_department[department].append((category, department))
+
+    # k + 1 per class, so each member can drop itself and keep k
+    width = k + 1
+    ranked = []
+    for category, department, tags in signatures:
+        scores = {}
+        for tag in tags:
+            for other in by_tag.get(tag, ()):
+                scores[other] = scores.get(other, 0) + 1
+        for other in scores:
+            other_category, other_department, _ = signatures[other]
+            if other_category == category:
+                scores[other] += CATEGORY_SCORE
+            if other_department == department:
+                scores[other] += DEPARTMENT_SCORE
+
+        candidates = [
+            (-score, position)
+            for other, score in scores.items()
+            for position in members[other][:width]
+        ]
+        own_group = (category, department)
+        bonus_groups = [(CATEGORY_SCORE + DEPARTMENT_SCORE, [own_group])]
+        bonus_groups.append((CATEGORY_SCORE, [
+            key for key in group_keys_by_category[category] if key != own_group
+        ]))
+        bonus_groups.append((DEPARTMENT_SCORE, [
+            key for key in group_keys_by_department[department] if key != own_group
+        ]))
+        for score, keys in bonus_groups:
+            for key in keys:
+                candidates += [
+                    (-score, position)
+                    for position in _earliest(groups[key], members, width, scores)
+                ]
+        ranked.append([position for _, position in heapq.nsmallest(width, candidates)])
+
+    related = []
+    for position, (category, department, tags) in enumerate(records):
+        signature = (category, department, tuple(tags or ()))
+        top = ranked[class_of[signature]]
+        related.append([other for other in top if other != position][:k])
+    return related
@@ -0,0 +1,180 @@
+"""
+Prebuilt inverted search index for the KB
+
+Mirrors ``KnowledgeBaseService.buildSearchIndex()`` in
+src/knowledgeBaseService.js: the same fields are joined, lowercased, split on
+JavaScript's ``\\s`` class and every word longer than two characters maps to
+the positions of the articles containing it. The client loads the result with
+``loadSearchIndex()`` instead of tokenizing every article body on page load.
+
+Index layout (``SEARCH_INDEX_VERSION`` 1)::
+
+    {
+      "version": 1,
+      "articles": 30,
+      "ids": ["KB-TECH-001", ...],
+      "postings": {"backup": [2, 5, 1], ...},
+      "df": {"backup": 3, ...},
+      "synonyms": {
+        "terms": {"security": {"protection": 0.5, ...}, ...},
+        "postings": {"protection": [0, 4, ...], ...}
+      }
+    }
+
+Posting lists are ascending article positions stored as gaps from the
+previous entry (the first gap is from 0), which keeps them short in JSON.
+``df`` is the number of articles containing each term.
+
+``synonyms`` replaces the per-query scan of
+``KnowledgeBaseService.findSemanticMatches()``: a query containing a term
+scores each related word's weight for every article in that word's posting
+list. As in the client, a related word matches when it occurs anywhere in
+the lowercased title, summary and content, including inside longer words.
+The dictionary lives in data/kb_synonyms.json; the section is omitted when
+the index is built without one.
+
+``related`` (when built with ``--related K``) is the K each article's
+``related`` list was cut to, so the client knows a shorter list already
+holds every candidate and ``getRelatedArticles(id, limit <= K)`` can use it
+as is.
+"""
+
+import json
+import re
+
+SEARCH_INDEX_VERSION = 1
+SYNONYM_WEIGHT = 0.5
+
+# JavaScript's \s: ECMAScript WhiteSpace plus LineTerminator
+_JS_WHITESPACE = re.compile(
+    "[\t\n\v\f\r \u00a0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000\ufeff]+"
+)
+
+
+def _template_value(article, key):
+    # How a `${article.key}` template substitution stringifies the field
+    if key not in article:
+        return "undefined"
+    value = article[key]
+    return "null" if value is None else str(value)
+
+
+def searchable_text(article):
+    """The lowercased text buildSearchIndex() tokenizes for one article"""
+    return "\n".join((
+        "",
+        _template_value(article, "title"),
+        _template_value(article, "category"),
+        _template_value(article, "department"),
+        " ".join(article.get("tags") or ()),
+        article.get("summary") or "",
+        article.get("content") or "",
+        "",
+    )).lower()
+
+
+def semantic_text(article):
+    """The lowercased text findSemanticMatches() searches for related words"""
+    return " ".join(
+        _template_value(article, key) for key in ("title", "summary", "content")
+    ).lower()
+
+
+def read_synonyms(path):
+    """Load a ``{term: [related word, ...]}`` synonym dictionary"""
+    with open(path, encoding="utf-8") as fp:
+        synonyms = json.load(fp)
+    if not isinstance(synonyms, dict) or not all(
+        isinstance(words, list) and all(isinstance(w, str) for w in words)
+        for words in synonyms.values()
+    ):
+        raise ValueError(f"{path}: expected an object of term -> list of related words")
+    return synonyms
+
+
+def _gaps(positions):
+    previous = 0
+    gaps = []
+    for position in positions:
+        gaps.append(position - previous)
+        previous = position
+    return gaps
+
+
+def tokenize(article):
+    """Set of index terms for one article"""
+    return {word for word in _JS_WHITESPACE.split(searchable_text(article)) if len(word) > 2}
+
+
+class SearchIndexBuilder:
+    """Accumulates posting lists as articles stream past"""
+
+    def __init__(self, synonyms=None):
+        self.ids = []
+        self._postings = {}
+        self._synonyms = synonyms
+        # Each related word is looked up once per article, however many
+        # terms list it
+        self._related = (
+            {word: [] for words in synonyms.values() for word in words} if synonyms else {}
+        )
+
+    def add(self, article):
+        position = len(self.ids)
+        self.ids.append(article.get("id"))
+        for term in tokenize(article):
+            postings = self._postings.get(term)
+            if postings is None:
+                self._postings[term] = [position]
+            else:
+                postings.append(position)
+        if self._related:
+            text = semantic_text(article)
+            for word, positions in self._related.items():
+                if word in text:
+                    positions.append(position)
+
+    def to_dict(self):
+        postings = {}
+        df = {}
+        for term in sorted(self._postings):
+            positions = self._postings[term]
+            postings[term] = _gaps(positions)
+            df[term] = len(positions)
+        index = {
+            "version": SEARCH_INDEX_VERSION,
+            "articles": len(self.ids),
+            "ids": self.ids,
+            "postings": postings,
+            "df": df,
+        }
+        if self._synonyms:
+            index["synonyms"] = {
+                "terms": {
+                    term: {word: SYNONYM_WEIGHT for word in words}
+                    for term, words in self._synonyms.items()
+                },
+                "postings": {
+                    word: _gaps(positions)
+                    for word, positions in sorted(self._related.items())
+                    if positions
+                },
+            }
+        return index
+
+
+def build_search_index(articles, synonyms=None, related=None):
+    builder = SearchIndexBuilder(synonyms)
+    for article in articles:
+        builder.add(article)
+    index = builder.to_dict()
+    if related:
+        index["related"] = related
+    return index
+
+
+def write_search_index(articles, fp, synonyms=None, related=None):
+    """Index articles and write the compact index JSON to fp. Returns the term count."""
+    index = build_search_index(articles, synonyms, related)
+    json.dump(index, fp, separators=(",", ":"))
+    return len(index["df"])
@@ -0,0 +1,154 @@
+"""
+Sharded KB output: a small metadata file plus lazily-fetched article bodies
+
+Listing, search and related-article lookups only need each article's
+metadata, so the build splits records into::
+
+    <dir>/kb-meta.json            every record without its ``content``
+    <dir>/kb-shards/<shard>.json  {"<article id>": "<markdown body>", ...}
+    <dir>/kb-shards.json          shard manifest (below)
+
+Shards are keyed by department slug, or by a stable hash of the article id
+when one department is too large to fetch as a unit. The manifest maps every
+article id to its shard and records each shard's digest so clients can
+cache-bust only the shards that changed::
+
+    {
+      "version": 1,
+      "shard_by": "department",
+      "metadata": "kb-meta.json",
+      "shards": {"technology": {"path": "kb-shards/technology.json",
+                                "articles": 5, "digest": "..."}},
+      "articles": {"KB-TECH-001": "technology", ...},
+      "related": 5
+    }
+
+``related`` is present when articles carry ``related`` lists ranked to
+that many entries (``--related K``); see kb_build/search_index.py.
+
+All files are written in one streaming pass with one open handle per shard,
+and each is moved into place atomically once complete.
+"""
+
+import hashlib
+import json
+import os
+from contextlib import ExitStack
+
+from .compress import GZIP_SUFFIX
+from .manifest import atomic_open
+
+SHARD_MANIFEST_VERSION = 1
+
+METADATA_FILE = "kb-meta.json"
+SHARD_MANIFEST_FILE = "kb-shards.json"
+SHARD_DIR = "kb-shards"
+
+SHARD_MODES = ("department", "hash")
+DEFAULT_BUCKETS = 16
+
+
+def hash_bucket(article_id, buckets):
+    """Stable bucket for an article id, independent of PYTHONHASHSEED"""
+    digest = hashlib.blake2b(article_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % buckets
+
+
+def shard_namer(shard_by="department", buckets=DEFAULT_BUCKETS):
+    """Return a function mapping an article record to its shard name"""
+    if shard_by == "department":
+        return lambda article: article["department"]
+    if shard_by == "hash":
+        width = len(f"{buckets - 1:x}")
+        return lambda article: f"{hash_bucket(article['id'], buckets):0{width}x}"
+    raise ValueError(f"unknown shard mode '{shard_by}', expected one of {SHARD_MODES}")
+
+
+class _ShardWriter:
+    """Streams one ``{id: content}`` shard object and digests it as it goes"""
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.count = 0
+        self._digest = hashlib.blake2b(digest_size=16)
+        self._write("{")
+
+    def _write(self, text):
+        self.fp.write(text)
+        self._digest.update(text.encode("utf-8"))
+
+    def add(self, article_id, content):
+        self._write(",\n" if self.count else "\n")
+        self._write(json.dumps(article_id) + ":" + json.dumps(content))
+        self.count += 1
+
+    def close(self):
+        self._write("\n}\n" if self.count else "}\n")
+        return self._digest.hexdigest()
+
+
+def write_sharded(articles, directory, shard_by="department", buckets=DEFAULT_BUCKETS,
+                  related=None):
+    """Write metadata, body shards and the shard manifest under directory.
+
+    Returns the shard manifest dict. Shard files left over from a previous
+    layout are removed.
+    """
+    name_for = shard_namer(shard_by, buckets)
+    shard_root = os.path.join(directory, SHARD_DIR)
+    os.makedirs(shard_root, exist_ok=True)
+
+    writers = {}
+    article_shards = {}
+    with ExitStack() as stack:
+        meta = stack.enter_context(atomic_open(os.path.join(directory, METADATA_FILE)))
+        meta.write("[")
+        for article in articles:
+            name = name_for(article)
+            writer = writers.get(name)
+            if writer is None:
+                fp = stack.enter_context(atomic_open(os.path.join(shard_root, name + ".json")))
+                writer = writers[name] = _ShardWriter(fp)
+
+            metadata = {key: value for key, value in article.items() if key != "content"}
+            meta.write(",\n" if article_shards else "\n")
+            meta.write(json.dumps(metadata, separators=(",", ":")))
+            writer.add(article["id"], article.get("content", ""))
+            article_shards[article["id"]] = name
+        meta.write("\n]\n" if article_shards else "]\n")
+
+        shards = {
+            name: {
+                "path": f"{SHARD_DIR}/{name}.json",
+                "articles": writer.count,
+                "digest": writer.close(),
+            }
+            for name, writer in sorted(writers.items())
+        }
+
+    # Precompressed siblings of removed shards go too
+    for entry in os.listdir(shard_root):
+        name = entry[:-len(GZIP_SUFFIX)] if entry.endswith(GZIP_SUFFIX) else entry
+        if name.endswith(".json") and name[:-len(".json")] not in shards:
+            os.remove(os.path.join(shard_root, entry))
+
+    layout = {
+        "version": SHARD_MANIFEST_VERSION,
+        "shard_by": shard_by,
+        "metadata": METADATA_FILE,
+        "shards": shards,
+        "articles": article_shards,
+    }
+    if related:
+        layout["related"] = related
+    with atomic_open(os.path.join(directory, SHARD_MANIFEST_FILE)) as fp:
+        json.dump(layout, fp, separators=(",", ":"))
+    return layout
+
+
+def sharded_files(layout, directory):
+    """Paths of every file write_sharded() produced for layout"""
+    paths = [os.path.join(directory, layout["metadata"])]
+    paths += [os.path.join(directory, shard["path"]) for shard in layout["shards"].values()]
+    paths.append(os.path.join(directory, SHARD_MANIFEST_FILE))
+    return paths
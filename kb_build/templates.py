@@ -0,0 +1,137 @@
+"""
+Precompiled article templates
+
+A template is plain markdown with ``{{slot}}`` placeholders. It is parsed once
+into alternating static segments and slot names. Rendering an article copies
+a pre-sized list of those pieces, fills the slot positions and joins it once,
+so the static text is never re-laid out or re-scanned.
+
+Templates live in a directory with one ``<department-slug>.tmpl`` file per
+department and a ``default.tmpl`` fallback, e.g.::
+
+    data/kb_templates/default.tmpl
+    data/kb_templates/website-design.tmpl
+"""
+
+import os
+import re
+
+from .manifest import text_digest
+
+SLOT_PATTERN = re.compile(r"\{\{\s*([a-z_][a-z0-9_]*)\s*\}\}")
+
+TEMPLATE_SUFFIX = ".tmpl"
+DEFAULT_TEMPLATE = "default"
+
+
+class TemplateError(ValueError):
+    """Raised when a template cannot be loaded or rendered"""
+
+
+class Template:
+    """A template compiled into static segments and slots"""
+
+    __slots__ = (
+        "name", "source", "digest", "segments", "slot_order", "slots", "_pieces", "_positions",
+    )
+
+    def __init__(self, source, name="<string>", allowed_slots=None):
+        self.name = name
+        self.source = source
+        self.digest = text_digest(source)
+
+        segments = []
+        slot_order = []
+        last = 0
+        for match in SLOT_PATTERN.finditer(source):
+            slot = match.group(1)
+            if allowed_slots is not None and slot not in allowed_slots:
+                raise TemplateError(f"{name}: unknown slot '{{{{{slot}}}}}'")
+            segments.append(source[last:match.start()])
+            slot_order.append(slot)
+            last = match.end()
+        segments.append(source[last:])
+
+        self.segments = tuple(segments)
+        self.slot_order = tuple(slot_order)
+        self.slots = frozenset(slot_order)
+
+        # static segments at even positions, slot values at odd positions
+        self._pieces = [""] * (2 * len(segments) - 1)
+        self._pieces[::2] = segments
+        self._positions = tuple((2 * i + 1, slot) for i, slot in enumerate(slot_order))
+
+    def render(self, context):
+        """Fill every slot from the context mapping and return the text"""
+        pieces = self._pieces.copy()
+        try:
+            for position, slot in self._positions:
+                pieces[position] = context[slot]
+        except KeyError as error:
+            raise TemplateError(f"{self.name}: missing value for slot {error}") from None
+        return "".join(pieces)
+
+    def partial(self, context):
+        """Return a new template with the slots found in context filled in.
+
+        Used to bake per-department values into the static segments once, so
+        each article only fills its own slots.
+        """
+        source = SLOT_PATTERN.sub(
+            lambda match: context.get(match.group(1), match.group(0)), self.source
+        )
+        return Template(source, name=self.name)
+
+    def __repr__(self):
+        return f"Template({self.name!r}, slots={sorted(self.slots)})"
+
+
+def read_template(path, allowed_slots=None):
+    """Load and compile a template file.
+
+    A single trailing newline is dropped so files can end with one without
+    it leaking into the rendered article.
+    """
+    with open(path, encoding="utf-8") as fp:
+        source = fp.read()
+    if source.endswith("\n"):
+        source = source[:-1]
+    return Template(source, name=os.path.basename(path), allowed_slots=allowed_slots)
+
+
+class TemplateSet:
+    """Per-department templates loaded lazily from a directory"""
+
+    def __init__(self, directory, allowed_slots=None):
+        self.directory = directory
+        self.allowed_slots = allowed_slots
+        self._cache = {}
+        self._bound = {}
+
+    def path_for(self, name):
+        return os.path.join(self.directory, name + TEMPLATE_SUFFIX)
+
+    def for_department(self, slug):
+        """Return the template for a department slug, or the default one"""
+        template = self._cache.get(slug)
+        if template is None:
+            path = self.path_for(slug)
+            if not os.path.exists(path):
+                path = self.path_for(DEFAULT_TEMPLATE)
+            if not os.path.exists(path):
+                raise TemplateError(f"no template for '{slug}' and no default in {self.directory}")
+            template = read_template(path, self.allowed_slots)
+            self._cache[slug] = template
+        return template
+
+    def bound(self, slug, static_context):
+        """Return the department template with static_context baked in.
+
+        The result is cached per slug; static_context must only depend on
+        the department.
+        """
+        template = self._bound.get(slug)
+        if template is None:
+            template = self.for_department(slug).partial(static_context)
+            self._bound[slug] = template
+        return template
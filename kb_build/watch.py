@@ -0,0 +1,65 @@
+"""
+Polling file watcher for ``generate_kb_articles.py --watch``
+
+SourceWatcher stats a fixed set of files and directories and reports which
+files changed since the previous poll. A change is any difference in
+modification time (nanoseconds) or size, and files appearing in or
+vanishing from a watched directory count too. Directories are listed one
+level deep, keeping files with the given suffixes.
+
+Polling a few dozen paths costs well under a millisecond, needs no
+platform-specific notification API and behaves the same on network and
+container-mounted filesystems, where inotify-style events are unreliable.
+"""
+
+import os
+import time
+
+DEFAULT_INTERVAL = 0.1
+
+
+class SourceWatcher:
+    """Detects changes to files and to the contents of directories by mtime"""
+
+    def __init__(self, paths, suffixes=(".json", ".tmpl")):
+        self.paths = list(paths)
+        self.suffixes = tuple(suffixes)
+        self.snapshot = self.scan()
+
+    def _files(self):
+        for path in self.paths:
+            if os.path.isdir(path):
+                for entry in sorted(os.scandir(path), key=lambda entry: entry.name):
+                    if entry.name.endswith(self.suffixes) and entry.is_file():
+                        yield entry.path
+            else:
+                yield path
+
+    def scan(self):
+        """{path: (mtime_ns, size)} of every watched file that exists"""
+        state = {}
+        for path in self._files():
+            try:
+                info = os.stat(path)
+            except OSError:
+                continue
+            state[path] = (info.st_mtime_ns, info.st_size)
+        return state
+
+    def poll(self):
+        """Sorted paths added, removed or modified since the last poll"""
+        current = self.scan()
+        changed = sorted(
+            path for path in current.keys() | self.snapshot.keys()
+            if current.get(path) != self.snapshot.get(path)
+        )
+        self.snapshot = current
+        return changed
+
+    def wait(self, interval=DEFAULT_INTERVAL):
+        """Block until something changes and return the changed paths"""
+        while True:
+            changed = self.poll()
+            if changed:
+                return changed
+            time.sleep(interval)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Benchmark the KB generator stages at catalogue scale
+
+Synthesizes tenant variants of the article catalogue (see
+bench_kb_workers.py) at several sizes and times each build stage on its own:
+
+    related       precompute related-article ids (with_related)
+    dedup         near-duplicate body clusters (duplicate_clusters)
+    render        build every article record from its template
+    json          render + serialize the pretty-printed JSON array
+    ndjson        render + serialize NDJSON
+    search_index  render + build and serialize the inverted search index
+
+Every (size, stage) pair runs in a fresh process so its peak RSS is its own.
+Results are written as JSON; pass a previous results file with --compare to
+flag stages that got slower or larger beyond --threshold (exit status 1).
+
+Usage:
+    python3 scripts/bench_kb.py -o bench/kb-$(git rev-parse --short HEAD).json
+    python3 scripts/bench_kb.py --counts 1000 10000 --compare bench/kb-main.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import generate_kb_articles as gen  # noqa: E402
+from bench_kb_workers import synthesize_catalog  # noqa: E402
+from kb_build import write_search_index  # noqa: E402
+
+RESULTS_VERSION = 1
+DEFAULT_COUNTS = (1000, 10000, 100000)
+DEFAULT_THRESHOLD = 0.10
+# Timings below this are mostly noise and are not checked for regressions
+NOISE_FLOOR_SECONDS = 0.05
+
+
+def _render(catalog):
+    for _ in gen.iter_articles(catalog):
+        pass
+
+
+def _write(fmt):
+    def stage(catalog):
+        with open(os.devnull, "w", encoding="utf-8") as sink:
+            gen.build(sink, fmt=fmt, catalog=catalog)
+    return stage
+
+
+def _search_index(catalog):
+    with open(os.devnull, "w", encoding="utf-8") as sink:
+        write_search_index(gen.iter_articles(catalog), sink)
+
+
+STAGES = {
+    "related": lambda catalog: gen.with_related(catalog, gen.DEFAULT_RELATED),
+    "dedup": gen.duplicate_clusters,
+    "render": _render,
+    "json": _write("json"),
+    "ndjson": _write("ndjson"),
+    "search_index": _search_index,
+}
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_stage(stage, count, repeat):
+    """Run one stage in the current (fresh) process: best time and peak RSS"""
+    catalog = synthesize_catalog(count)
+    if stage != "related":
+        catalog = gen.with_related(catalog, gen.DEFAULT_RELATED)
+    run = STAGES[stage]
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run(catalog)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return {"seconds": round(best, 6), "peak_rss": peak_rss()}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(counts, stages, repeat):
+    results = {}
+    context = get_context("spawn")
+    for count in counts:
+        results[str(count)] = {}
+        for stage in stages:
+            with ProcessPoolExecutor(1, mp_context=context) as pool:
+                result = pool.submit(run_stage, stage, count, repeat).result()
+            results[str(count)][stage] = result
+            rss = result["peak_rss"]
+            print(
+                f"{count:>9} {stage:<13} {result['seconds']:>9.3f} "
+                f"{count / result['seconds']:>10.0f} "
+                f"{rss / 2 ** 20 if rss else float('nan'):>9.1f}",
+                flush=True,
+            )
+    return {
+        "version": RESULTS_VERSION,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Return (count, stage, metric, before, after) for every regression.
+
+    A regression is a stage whose time or peak RSS grew by more than
+    threshold (a fraction) over the baseline run of the same size. Stages
+    faster than NOISE_FLOOR_SECONDS in the baseline are only checked for
+    memory.
+    """
+    regressions = []
+    for count, stages in current["results"].items():
+        for stage, result in stages.items():
+            before = baseline.get("results", {}).get(count, {}).get(stage)
+            if before is None:
+                continue
+            for metric in ("seconds", "peak_rss"):
+                old, new = before.get(metric), result.get(metric)
+                if metric == "seconds" and (old or 0) < NOISE_FLOOR_SECONDS:
+                    continue
+                if old and new and new > old * (1 + threshold):
+                    regressions.append((int(count), stage, metric, old, new))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=list(DEFAULT_COUNTS))
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Runs per stage; the best time is kept")
+    parser.add_argument("-o", "--output", help="Write results JSON here")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="Results JSON from an earlier commit to check for regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed slowdown/growth as a fraction (default: {DEFAULT_THRESHOLD})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print(f"cpus={os.cpu_count()} repeat={args.repeat}")
+    print(f"{'articles':>9} {'stage':<13} {'seconds':>9} {'art/s':>10} {'peak MiB':>9}")
+    current = run_benchmarks(args.counts, args.stages, args.repeat)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(current, fp, indent=2)
+            fp.write("\n")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fp:
+            baseline = json.load(fp)
+        regressions = compare(current, baseline, args.threshold)
+        print(f"\nCompared with {baseline.get('commit') or args.compare}:")
+        for count, stage, metric, old, new in regressions:
+            print(f"  REGRESSION {count} {stage} {metric}: {old} -> {new} ({new / old - 1:+.1%})")
+        if regressions:
+            return 1
+        print(f"  no regressions over {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark generate_kb_articles.py rendering with and without a process pool
+
+Synthesizes tenant variants of the article catalogue at several sizes and
+times a full NDJSON build (render + serialize, written to /dev/null) for each
+worker count, then prints the speedup relative to the first worker count
+(1, the serial path, by default).
+
+Usage:
+    python3 scripts/bench_kb_workers.py
+    python3 scripts/bench_kb_workers.py --counts 1000 10000 100000 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_kb_articles as gen  # noqa: E402
+
+
+def synthesize_catalog(count):
+    """Return a catalogue of `count` articles built from tenant variants"""
+    base = [(dept, info) for dept, infos in gen.articles_data.items() for info in infos]
+    catalog = {dept: [] for dept in gen.articles_data}
+    for n in range(count):
+        dept, info = base[n % len(base)]
+        tenant = n // len(base)
+        catalog[dept].append({**info, "id": f"{info['id']}-T{tenant:05d}"})
+    return catalog
+
+
+def time_build(catalog, workers, chunk_size):
+    with open(os.devnull, "w", encoding="utf-8") as sink:
+        started = time.perf_counter()
+        gen.build(sink, fmt="ndjson", workers=workers, chunk_size=chunk_size, catalog=catalog)
+        return time.perf_counter() - started
+
+
+def parse_args(argv=None):
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, cpus}))
+    parser.add_argument("--chunk-size", type=int, default=gen.DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Runs per configuration; the best time is kept")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print(f"cpus={os.cpu_count()} chunk_size={args.chunk_size} repeat={args.repeat}")
+    print(f"{'articles':>9} {'workers':>7} {'seconds':>9} {'art/s':>10} {'speedup':>8}")
+
+    for count in args.counts:
+        catalog = synthesize_catalog(count)
+        serial = None
+        for workers in args.workers:
+            best = min(time_build(catalog, workers, args.chunk_size)
+                       for _ in range(args.repeat))
+            serial = serial or best
+            print(f"{count:>9} {workers:>7} {best:>9.3f} {count / best:>10.0f} "
+                  f"{serial / best:>7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
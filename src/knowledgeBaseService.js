@@ -15,6 +15,37 @@
 import { supabase } from './supabaseClient.js';
 import { logger } from './logger.js';
 
+/**
+ * Base URL of the generated KB files.
+ *
+ * @type {string}
+ */
+const KB_DATA_URL = '/public/data/';
+
+/**
+ * Weight a related word adds to an article's semantic score.
+ *
+ * @type {number}
+ */
+const SYNONYM_WEIGHT = 0.5;
+
+/**
+ * Synonym dictionary for semantic matching, used when the prebuilt search
+ * index has no synonym table. generate_kb_articles.py owns the dictionary
+ * (data/kb_synonyms.json) and ships it in kb-index.json.
+ *
+ * @type {Object<string, Array<string>>}
+ */
+const DEFAULT_SYNONYMS = {
+  security: ['protection', 'safety', 'compliance', 'audit'],
+  hack: ['breach', 'attack', 'intrusion', 'vulnerability'],
+  website: ['site', 'web', 'page', 'portal'],
+  email: ['mail', 'message', 'correspondence'],
+  slow: ['performance', 'speed', 'lag', 'delay'],
+  marketing: ['campaign', 'promotion', 'advertising'],
+  design: ['branding', 'visual', 'creative', 'ui'],
+};
+
 /**
  * Knowledge Base Service for intelligent article search and recommendations.
  *
@@ -44,6 +75,55 @@ export class KnowledgeBaseService {
      */
     this.searchIndex = new Map();
 
+    /**
+     * Articles keyed by ID, and the articles array the map was built from.
+     * Rebuilt by getArticlesById() when the articles array changes.
+     *
+     * @type {Map<string, Object>|null}
+     * @private
+     */
+    this.articlesById = null;
+    this.articlesByIdSource = null;
+
+    /**
+     * Number of related ids generate_kb_articles.py ranked for each article
+     * (`--related K`), from kb-shards.json or kb-index.json. A `related`
+     * list shorter than this holds every related article. 0 when unknown.
+     *
+     * @type {number}
+     * @private
+     */
+    this.relatedLimit = 0;
+
+    /**
+     * Synonym table for semantic matching: query terms with their weighted
+     * related words, and the article indices containing each related word.
+     * Built for the articles array it was computed from.
+     *
+     * @type {{terms: Map<string, Array<Array>>, postings: Map<string, Array<number>>}|null}
+     * @private
+     */
+    this.synonymIndex = null;
+    this.synonymIndexSource = null;
+
+    /**
+     * Shard manifest from generate_kb_articles.py --shard-dir, when deployed.
+     * Articles are then loaded without content and bodies are fetched per
+     * shard on demand.
+     *
+     * @type {Object|null}
+     * @private
+     */
+    this.shardManifest = null;
+
+    /**
+     * In-flight or completed shard fetches, keyed by shard name.
+     *
+     * @type {Map<string, Promise<Object|null>>}
+     * @private
+     */
+    this.shardRequests = new Map();
+
     /**
      * Initialization status flag.
      *
@@ -56,7 +136,10 @@ export class KnowledgeBaseService {
   /**
    * Initialize the knowledge base by loading articles and building search index.
    *
-   * Loads articles from JSON file and creates inverted index for fast searching.
+   * Loads article metadata from the shard manifest when one is deployed, or
+   * the full articles JSON file otherwise. Uses the prebuilt inverted index
+   * written by generate_kb_articles.py when it matches the loaded articles,
+   * falling back to indexing in the browser otherwise.
    * Safe to call multiple times - will only initialize once.
    *
    * @async
@@ -69,10 +152,20 @@ export class KnowledgeBaseService {
     if (this.initialized) return;
 
     try {
-      const response = await fetch('/public/data/kb.json');
+      const shardManifest = await this.fetchOptionalJson('kb-shards.json');
+      if (shardManifest && shardManifest.version === 1) {
+        this.shardManifest = shardManifest;
+        this.relatedLimit = shardManifest.related || 0;
+      }
+
+      const articlesFile = this.shardManifest?.metadata || 'kb.json';
+      const response = await fetch(`${KB_DATA_URL}${articlesFile}`);
       const data = await response.json();
-      this.articles = data.articles || [];
-      this.buildSearchIndex();
+      this.articles = Array.isArray(data) ? data : data.articles || [];
+      const prebuiltIndex = await this.fetchOptionalJson('kb-index.json');
+      if (!this.loadSearchIndex(prebuiltIndex)) {
+        this.buildSearchIndex();
+      }
       this.initialized = true;
     } catch (error) {
       logger.warn('Failed to load knowledge base', { error: error.message });
@@ -80,6 +173,163 @@ export class KnowledgeBaseService {
     }
   }
 
+  /**
+   * Fetch an optional generated KB file such as the prebuilt search index.
+   *
+   * @async
+   * @private
+   * @param {string} path - Path relative to the KB data directory
+   * @returns {Promise<Object|null>} Parsed JSON, or null when unavailable
+   */
+  async fetchOptionalJson(path) {
+    try {
+      const response = await fetch(`${KB_DATA_URL}${path}`);
+      if (!response.ok) return null;
+      return await response.json();
+    } catch (error) {
+      return null;
+    }
+  }
+
+  /**
+   * Load an article's body from its shard if it was loaded without one.
+   *
+   * Each shard is fetched at most once; its digest is appended to the URL so
+   * a rebuilt shard bypasses stale HTTP caches.
+   *
+   * @async
+   * @private
+   * @param {Object} article - Article record (updated in place)
+   * @returns {Promise<Object>} The same article
+   */
+  async loadArticleContent(article) {
+    if (article.content !== undefined || !this.shardManifest) return article;
+
+    const shardName = this.shardManifest.articles?.[article.id];
+    const shard = shardName && this.shardManifest.shards?.[shardName];
+    if (!shard) return article;
+
+    if (!this.shardRequests.has(shardName)) {
+      this.shardRequests.set(
+        shardName,
+        this.fetchOptionalJson(`${shard.path}?v=${shard.digest}`)
+      );
+    }
+
+    const bodies = await this.shardRequests.get(shardName);
+    if (!bodies) {
+      // Allow a retry on the next open
+      this.shardRequests.delete(shardName);
+    } else if (typeof bodies[article.id] === 'string') {
+      article.content = bodies[article.id];
+    }
+    return article;
+  }
+
+  /**
+   * Load a prebuilt inverted index produced by generate_kb_articles.py.
+   *
+   * Posting lists are gap-encoded article positions. The index is only used
+   * if it was built from the same articles, in the same order, as the ones
+   * currently loaded.
+   *
+   * @private
+   * @param {Object|null} index - Index JSON (version, ids, postings, df,
+   *   and optionally synonyms and related)
+   * @returns {boolean} Whether the index was loaded
+   */
+  loadSearchIndex(index) {
+    if (!index || index.version !== 1 || !index.postings) return false;
+    if (
+      !Array.isArray(index.ids) ||
+      index.ids.length !== this.articles.length ||
+      index.ids.some((id, i) => this.articles[i].id !== id)
+    ) {
+      return false;
+    }
+
+    const searchIndex = new Map();
+    Object.entries(index.postings).forEach(([word, gaps]) => {
+      const indices = new Set();
+      let position = 0;
+      gaps.forEach((gap) => {
+        position += gap;
+        indices.add(position);
+      });
+      searchIndex.set(word, indices);
+    });
+
+    this.searchIndex = searchIndex;
+    if (index.related) {
+      this.relatedLimit = index.related;
+    }
+    if (index.synonyms?.terms && index.synonyms.postings) {
+      this.synonymIndex = this.decodeSynonymIndex(index.synonyms);
+      this.synonymIndexSource = this.articles;
+    }
+    return true;
+  }
+
+  /**
+   * Decode the synonym table of a prebuilt search index.
+   *
+   * @private
+   * @param {Object} synonyms - `synonyms` section of kb-index.json
+   * @returns {Object} Synonym table (see synonymIndex)
+   */
+  decodeSynonymIndex(synonyms) {
+    const terms = new Map(
+      Object.entries(synonyms.terms).map(([term, related]) => [
+        term,
+        Object.entries(related),
+      ])
+    );
+    const postings = new Map();
+    Object.entries(synonyms.postings).forEach(([word, gaps]) => {
+      let position = 0;
+      postings.set(word, gaps.map((gap) => (position += gap)));
+    });
+    return { terms, postings };
+  }
+
+  /**
+   * Build the synonym table from DEFAULT_SYNONYMS by scanning articles once.
+   *
+   * @private
+   * @returns {Object} Synonym table (see synonymIndex)
+   */
+  buildSynonymIndex() {
+    const terms = new Map();
+    const postings = new Map();
+    Object.entries(DEFAULT_SYNONYMS).forEach(([term, relatedTerms]) => {
+      terms.set(term, relatedTerms.map((related) => [related, SYNONYM_WEIGHT]));
+      relatedTerms.forEach((related) => postings.set(related, []));
+    });
+
+    this.articles.forEach((article, index) => {
+      const articleText =
+        `${article.title} ${article.summary} ${article.content}`.toLowerCase();
+      postings.forEach((indices, related) => {
+        if (articleText.includes(related)) indices.push(index);
+      });
+    });
+    return { terms, postings };
+  }
+
+  /**
+   * Synonym table for the current articles, building it if needed.
+   *
+   * @private
+   * @returns {Object} Synonym table (see synonymIndex)
+   */
+  getSynonymIndex() {
+    if (this.synonymIndexSource !== this.articles) {
+      this.synonymIndex = this.buildSynonymIndex();
+      this.synonymIndexSource = this.articles;
+    }
+    return this.synonymIndex;
+  }
+
   /**
    * Build inverted search index for fast keyword lookup.
    *
@@ -210,49 +460,31 @@ export class KnowledgeBaseService {
   /**
    * Find semantic matches using synonym matching.
    *
-   * Enhances search results by matching related terms.
+   * Enhances search results by matching related terms. Uses the synonym
+   * table from the prebuilt index when loaded, so a query costs a few
+   * lookups instead of a scan of every article body.
    *
    * @private
    * @param {string} query - Search query
    * @returns {Array<Object>} Array of {index, score} objects
    */
   findSemanticMatches(query) {
-    const matches = [];
     const lowerQuery = query.toLowerCase();
-
-    // Synonym dictionary for semantic matching
-    const synonyms = {
-      security: ['protection', 'safety', 'compliance', 'audit'],
-      hack: ['breach', 'attack', 'intrusion', 'vulnerability'],
-      website: ['site', 'web', 'page', 'portal'],
-      email: ['mail', 'message', 'correspondence'],
-      slow: ['performance', 'speed', 'lag', 'delay'],
-      marketing: ['campaign', 'promotion', 'advertising'],
-      design: ['branding', 'visual', 'creative', 'ui'],
-    };
-
-    this.articles.forEach((article, index) => {
-      let semanticScore = 0;
-      const articleText =
-        `${article.title} ${article.summary} ${article.content}`.toLowerCase();
-
-      // Check for synonym matches
-      Object.entries(synonyms).forEach(([term, relatedTerms]) => {
-        if (lowerQuery.includes(term)) {
-          relatedTerms.forEach((related) => {
-            if (articleText.includes(related)) {
-              semanticScore += 0.5;
-            }
-          });
-        }
+    const { terms, postings } = this.getSynonymIndex();
+    const scores = new Map();
+
+    terms.forEach((relatedTerms, term) => {
+      if (!lowerQuery.includes(term)) return;
+      relatedTerms.forEach(([related, weight]) => {
+        (postings.get(related) || []).forEach((index) => {
+          scores.set(index, (scores.get(index) || 0) + weight);
+        });
       });
-
-      if (semanticScore > 0) {
-        matches.push({ index, score: semanticScore });
-      }
     });
 
-    return matches;
+    return [...scores.entries()]
+      .sort((a, b) => a[0] - b[0])
+      .map(([index, score]) => ({ index, score }));
   }
 
   /**
@@ -276,6 +508,7 @@ export class KnowledgeBaseService {
     const article = this.articles.find((a) => a.id === articleId);
 
     if (article) {
+      await this.loadArticleContent(article);
       await this.trackView(articleId);
       return { success: true, article };
     }
@@ -286,6 +519,11 @@ export class KnowledgeBaseService {
   /**
    * Get related articles based on category, department, and tags.
    *
+   * Uses the `related` ids precomputed by generate_kb_articles.py when the
+   * article carries at least `limit` of them, or when `limit` is within the
+   * build's K (a shorter list then already holds every related article);
+   * otherwise scores every article against the target.
+   *
    * @async
    * @param {string} articleId - Article ID to find related articles for
    * @param {number} [limit=5] - Maximum number of related articles
@@ -301,11 +539,23 @@ export class KnowledgeBaseService {
       await this.initialize();
     }
 
-    const article = this.articles.find((a) => a.id === articleId);
+    const articlesById = this.getArticlesById();
+    const article = articlesById.get(articleId);
     if (!article) {
       return { success: false, error: 'Article not found' };
     }
 
+    if (
+      Array.isArray(article.related) &&
+      (article.related.length >= limit || limit <= this.relatedLimit)
+    ) {
+      const precomputed = article.related
+        .slice(0, limit)
+        .map((id) => articlesById.get(id))
+        .filter(Boolean);
+      return { success: true, articles: precomputed };
+    }
+
     // Score articles by similarity
     const related = this.articles
       .filter((a) => a.id !== articleId)
@@ -334,6 +584,20 @@ export class KnowledgeBaseService {
     return { success: true, articles: related };
   }
 
+  /**
+   * Map of article ID to article, rebuilt when the articles array changes.
+   *
+   * @private
+   * @returns {Map<string, Object>} Articles keyed by ID
+   */
+  getArticlesById() {
+    if (this.articlesByIdSource !== this.articles) {
+      this.articlesById = new Map(this.articles.map((a) => [a.id, a]));
+      this.articlesByIdSource = this.articles;
+    }
+    return this.articlesById;
+  }
+
   /**
    * Track search query for analytics.
    *
@@ -132,6 +132,72 @@ describe('KnowledgeBaseService', () => {
     });
   });
 
+  describe('loadSearchIndex()', () => {
+    beforeEach(() => {
+      kbService.articles = [
+        { id: 'KB-001', title: 'Backup Guide' },
+        { id: 'KB-002', title: 'Email Guide' },
+        { id: 'KB-003', title: 'Backup Policy' },
+      ];
+    });
+
+    it('should decode gap-encoded postings', () => {
+      const loaded = kbService.loadSearchIndex({
+        version: 1,
+        articles: 3,
+        ids: ['KB-001', 'KB-002', 'KB-003'],
+        postings: { backup: [0, 2], guide: [0, 1] },
+        df: { backup: 2, guide: 2 },
+      });
+
+      assert.strictEqual(loaded, true);
+      assert.deepStrictEqual([...kbService.searchIndex.get('backup')], [0, 2]);
+      assert.deepStrictEqual([...kbService.searchIndex.get('guide')], [0, 1]);
+    });
+
+    it('should match buildSearchIndex() output', () => {
+      kbService.buildSearchIndex();
+      const expected = kbService.searchIndex;
+      const postings = {};
+      expected.forEach((indices, word) => {
+        let previous = 0;
+        postings[word] = [...indices].map((index) => {
+          const gap = index - previous;
+          previous = index;
+          return gap;
+        });
+      });
+
+      kbService.searchIndex = new Map();
+      kbService.loadSearchIndex({
+        version: 1,
+        ids: kbService.articles.map((a) => a.id),
+        postings,
+      });
+
+      assert.deepStrictEqual(kbService.searchIndex, expected);
+    });
+
+    it('should reject an index built from different articles', () => {
+      const loaded = kbService.loadSearchIndex({
+        version: 1,
+        ids: ['KB-001', 'KB-003', 'KB-002'],
+        postings: { backup: [0] },
+      });
+
+      assert.strictEqual(loaded, false);
+      assert.strictEqual(kbService.searchIndex.size, 0);
+    });
+
+    it('should reject a missing or unknown index', () => {
+      assert.strictEqual(kbService.loadSearchIndex(null), false);
+      assert.strictEqual(
+        kbService.loadSearchIndex({ version: 2, ids: [], postings: {} }),
+        false
+      );
+    });
+  });
+
   describe('findSemanticMatches()', () => {
     beforeEach(() => {
       kbService.articles = [
@@ -168,6 +234,35 @@ describe('KnowledgeBaseService', () => {
         assert.ok(match.score > 0);
       });
     });
+
+    it('should add 0.5 per related word found in the article', () => {
+      assert.deepStrictEqual(kbService.findSemanticMatches('security breach'), [
+        { index: 0, score: 1.5 },
+      ]);
+      // "ui" also matches inside "guide" and "building"
+      assert.deepStrictEqual(kbService.findSemanticMatches('website design'), [
+        { index: 0, score: 0.5 },
+        { index: 1, score: 2 },
+      ]);
+    });
+
+    it('should use the synonym table from the prebuilt index', () => {
+      kbService.loadSearchIndex({
+        version: 1,
+        ids: ['1', '2'],
+        postings: {},
+        synonyms: {
+          terms: { backup: { restore: 0.75, snapshot: 0.5 } },
+          postings: { restore: [1], snapshot: [0, 1] },
+        },
+      });
+
+      assert.deepStrictEqual(kbService.findSemanticMatches('Backup plan'), [
+        { index: 0, score: 0.5 },
+        { index: 1, score: 1.25 },
+      ]);
+      assert.deepStrictEqual(kbService.findSemanticMatches('security'), []);
+    });
   });
 
   describe('getArticleById()', () => {
@@ -193,6 +288,53 @@ describe('KnowledgeBaseService', () => {
     });
   });
 
+  describe('loadArticleContent()', () => {
+    let requested;
+
+    beforeEach(() => {
+      requested = [];
+      kbService.articles = [
+        { id: 'KB-001', title: 'Article 1' },
+        { id: 'KB-002', title: 'Article 2' },
+      ];
+      kbService.shardManifest = {
+        version: 1,
+        shards: {
+          technology: { path: 'kb-shards/technology.json', digest: 'abc' },
+        },
+        articles: { 'KB-001': 'technology', 'KB-002': 'technology' },
+      };
+      kbService.fetchOptionalJson = async (path) => {
+        requested.push(path);
+        return { 'KB-001': '# Body 1', 'KB-002': '# Body 2' };
+      };
+      kbService.initialized = true;
+    });
+
+    it('should fetch the body from its shard on open', async () => {
+      const result = await kbService.getArticleById('KB-001');
+
+      assert.strictEqual(result.article.content, '# Body 1');
+      assert.deepStrictEqual(requested, ['kb-shards/technology.json?v=abc']);
+    });
+
+    it('should fetch each shard only once', async () => {
+      await kbService.getArticleById('KB-001');
+      await kbService.getArticleById('KB-002');
+
+      assert.strictEqual(requested.length, 1);
+      assert.strictEqual(kbService.articles[1].content, '# Body 2');
+    });
+
+    it('should leave articles with content untouched', async () => {
+      const article = { id: 'KB-001', content: 'inline' };
+      await kbService.loadArticleContent(article);
+
+      assert.strictEqual(article.content, 'inline');
+      assert.strictEqual(requested.length, 0);
+    });
+  });
+
   describe('getRelatedArticles()', () => {
     beforeEach(() => {
       kbService.articles = [
@@ -244,6 +386,39 @@ describe('KnowledgeBaseService', () => {
       const result = await kbService.getRelatedArticles('KB-001', 1);
       assert.ok(result.articles.length <= 1);
     });
+
+    it('should use precomputed related ids when available', async () => {
+      kbService.articles = kbService.articles.map((a) => ({ ...a }));
+      kbService.articles[0].related = ['KB-003', 'KB-002'];
+
+      const result = await kbService.getRelatedArticles('KB-001', 2);
+      assert.deepStrictEqual(
+        result.articles.map((a) => a.id),
+        ['KB-003', 'KB-002']
+      );
+    });
+
+    it('should score articles when too few ids are precomputed', async () => {
+      kbService.articles = kbService.articles.map((a) => ({ ...a }));
+      kbService.articles[0].related = ['KB-003'];
+
+      const result = await kbService.getRelatedArticles('KB-001', 5);
+      assert.strictEqual(result.articles[0].id, 'KB-002');
+    });
+
+    it('should trust a short related list within the build K', async () => {
+      kbService.articles = kbService.articles.map((a) => ({ ...a }));
+      kbService.articles[0].related = ['KB-002'];
+      kbService.loadSearchIndex({
+        version: 1,
+        ids: kbService.articles.map((a) => a.id),
+        postings: {},
+        related: 5,
+      });
+
+      const result = await kbService.getRelatedArticles('KB-001', 5);
+      assert.deepStrictEqual(result.articles.map((a) => a.id), ['KB-002']);
+    });
   });
 
   describe('getPopularArticles()', () => {
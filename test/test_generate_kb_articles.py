@@ -0,0 +1,145 @@
+"""
+Unit tests for the KB article generator (generate_kb_articles.py)
+"""
+
+import copy
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+
+import generate_kb_articles as gen
+
+
+class WritersTest(unittest.TestCase):
+    def test_json_array_matches_json_dumps(self):
+        articles = list(gen.iter_articles())
+        buf = io.StringIO()
+        count = gen.write_json_array(iter(articles), buf)
+
+        self.assertEqual(count, len(articles))
+        self.assertEqual(buf.getvalue(), json.dumps(articles, indent=2) + "\n")
+
+    def test_json_array_empty(self):
+        buf = io.StringIO()
+        self.assertEqual(gen.write_json_array(iter([]), buf), 0)
+        self.assertEqual(json.loads(buf.getvalue()), [])
+
+    def test_ndjson_one_record_per_line(self):
+        buf = io.StringIO()
+        count = gen.write_ndjson(gen.iter_articles(), buf)
+        lines = buf.getvalue().splitlines()
+
+        self.assertEqual(len(lines), count)
+        self.assertEqual(json.loads(lines[0])["id"], "KB-TECH-001")
+
+
+class ParallelBuildTest(unittest.TestCase):
+    def test_worker_output_matches_serial(self):
+        serial, parallel = io.StringIO(), io.StringIO()
+        gen.build(serial, fmt="ndjson")
+        count = gen.build(parallel, fmt="ndjson", workers=2, chunk_size=4)
+
+        self.assertEqual(count, len(serial.getvalue().splitlines()))
+        self.assertEqual(parallel.getvalue(), serial.getvalue())
+
+
+class IncrementalBuildTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.catalog = copy.deepcopy(gen.articles_data)
+
+    def build(self, fmt="json"):
+        path = os.path.join(self.tmp.name, "kb." + fmt)
+        count, changes = gen.build_incremental(path, fmt=fmt, catalog=self.catalog)
+        with open(path, encoding="utf-8") as fp:
+            return fp.read(), changes
+
+    def full_build(self, fmt="json"):
+        buf = io.StringIO()
+        gen.build(buf, fmt=fmt, catalog=self.catalog)
+        return buf.getvalue()
+
+    def test_first_build_adds_everything(self):
+        text, changes = self.build()
+
+        self.assertEqual(text, self.full_build())
+        self.assertEqual(len(changes.added), 30)
+        self.assertEqual(changes.rendered, 30)
+
+    def test_rerun_without_changes_renders_nothing(self):
+        self.build()
+        _, changes = self.build()
+
+        self.assertTrue(changes.empty)
+        self.assertEqual(changes.rendered, 0)
+        self.assertEqual(changes.unchanged, 30)
+
+    def test_edit_rerenders_and_splices_one_article(self):
+        for fmt in ("json", "ndjson"):
+            with self.subTest(fmt=fmt):
+                self.catalog = copy.deepcopy(gen.articles_data)
+                self.build(fmt)
+                self.catalog["Content"][2]["summary"] = "Edited summary"
+                text, changes = self.build(fmt)
+
+                self.assertEqual(text, self.full_build(fmt))
+                self.assertEqual(changes.changed, ["KB-CONT-003"])
+                self.assertEqual(changes.rendered, 1)
+
+    def test_added_and_removed_articles(self):
+        self.build()
+        removed = self.catalog["Branding"].pop(0)
+        self.catalog["Branding"].append({**removed, "id": "KB-BRAND-006"})
+        text, changes = self.build()
+
+        self.assertEqual(text, self.full_build())
+        self.assertEqual(changes.added, ["KB-BRAND-006"])
+        self.assertEqual(changes.removed, ["KB-BRAND-001"])
+
+    def test_hand_written_article_moved_to_another_department(self):
+        self.catalog["Technology"][0]["content"] = "Hand-written body"
+        self.build()
+        self.catalog["Branding"].append(self.catalog["Technology"].pop(0))
+        text, changes = self.build()
+
+        self.assertEqual(text, self.full_build())
+        moved = next(a for a in json.loads(text) if a["id"] == "KB-TECH-001")
+        self.assertEqual(moved["category"], "Branding")
+        self.assertEqual(changes.changed, ["KB-TECH-001"])
+
+    def test_output_rewritten_outside_incremental_builds(self):
+        self.build()
+        path = os.path.join(self.tmp.name, "kb.json")
+        original = self.catalog["Content"][2]["summary"]
+        self.catalog["Content"][2]["summary"] = original.upper()
+        with open(path, "w", encoding="utf-8") as fp:
+            gen.build(fp, catalog=self.catalog)
+
+        self.catalog["Content"][2]["summary"] = original
+        text, changes = self.build()
+
+        self.assertEqual(text, self.full_build())
+        self.assertEqual(changes.rendered, 30)
+
+
+class MainTest(unittest.TestCase):
+    def test_writes_valid_json_and_reports_on_stderr(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "kb.json")
+            stderr = io.StringIO()
+            with redirect_stderr(stderr):
+                self.assertEqual(gen.main(["-o", path]), 0)
+
+            with open(path, encoding="utf-8") as fp:
+                articles = json.load(fp)
+
+        self.assertEqual(len(articles), sum(len(a) for a in gen.articles_data.values()))
+        self.assertIn(f"Generated {len(articles)} articles", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Unit tests for kb_build.catalog
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+import generate_kb_articles as gen
+from kb_build import catalog
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class CatalogTest(unittest.TestCase):
+    def setUp(self):
+        for cached in (
+            catalog.load_department, catalog.load_catalog, catalog._department_index, catalog._rendered,
+        ):
+            cached.cache_clear()
+
+    def test_import_reads_nothing(self):
+        code = (
+            "import sys, kb_build, generate_kb_articles\n"
+            "loaded = sorted(m for m in sys.modules if m.startswith(('kb_build.', 'concurrent')))\n"
+            "print(loaded, kb_build.catalog.load_catalog.cache_info().currsize)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        self.assertNotIn("concurrent", result.stdout)
+        self.assertTrue(result.stdout.strip().endswith(" 0"))
+
+    def test_render_loads_one_department_and_memoizes(self):
+        article = catalog.render("KB-TECH-002")
+
+        self.assertEqual(catalog.load_department.cache_info().currsize, 1)
+        self.assertEqual(article["category"], "Technology")
+        self.assertIn(article["title"], article["content"])
+        article["title"] = "changed"
+        article["tags"].append("changed")
+        again = catalog.render("KB-TECH-002")
+        self.assertNotEqual(again["title"], "changed")
+        self.assertNotIn("changed", again["tags"])
+        self.assertEqual(catalog._rendered.cache_info().hits, 1)
+        with self.assertRaises(KeyError):
+            catalog.render("KB-NONE-001")
+
+    def test_find_entry_indexes_each_department_once(self):
+        first = catalog.departments()[0]
+        department, info = catalog.find_entry("KB-TECH-002")
+
+        self.assertEqual((department, info["id"]), ("Technology", "KB-TECH-002"))
+        self.assertEqual(catalog._department_index.cache_info().currsize, 1)
+        self.assertEqual(department, first)
+        for info in catalog.load_department(first):
+            self.assertIs(catalog.find_entry(info["id"])[1], info)
+        self.assertEqual(catalog._department_index.cache_info().misses, 1)
+        with self.assertRaises(KeyError):
+            catalog.find_entry("KB-NONE-001")
+        self.assertEqual(catalog._department_index.cache_info().currsize, len(catalog.departments()))
+        catalog.reload()
+        self.assertEqual(catalog._department_index.cache_info().currsize, 0)
+
+    def test_catalog_matches_iter_articles(self):
+        data = catalog.load_catalog()
+
+        self.assertEqual(list(data), list(catalog.departments()))
+        self.assertIs(gen.articles_data, data)
+        for article in catalog.iter_articles():
+            self.assertEqual(catalog.render(article["id"]), article)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Unit tests for kb_build.compact
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import generate_kb_articles as gen
+from kb_build.compact import CompactFormatError, CompactKB, write_compact
+
+
+class CompactRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "kb.kbc")
+
+    def test_round_trip_matches_json_output(self):
+        catalog = gen.with_related(gen.articles_data)
+        buf = io.StringIO()
+        gen.build(buf, catalog=catalog)
+        expected = json.loads(buf.getvalue())
+
+        count = write_compact(gen.iter_articles(catalog), self.path)
+
+        with CompactKB(self.path) as kb:
+            self.assertEqual(count, len(expected))
+            self.assertEqual(len(kb), len(expected))
+            self.assertEqual(list(kb), expected)
+            for article in reversed(expected):
+                self.assertEqual(kb[article["id"]], article)
+
+    def test_numeric_columns_and_lookup(self):
+        articles = list(gen.iter_articles())
+        write_compact(iter(articles), self.path)
+
+        with CompactKB(self.path) as kb:
+            views = kb.column("view_count")
+            self.assertEqual(list(views), [a["view_count"] for a in articles])
+            views.release()
+            self.assertIn("KB-OPS-003", kb)
+            self.assertNotIn("KB-NOPE", kb)
+            self.assertIsNone(kb.get("KB-NOPE"))
+            with self.assertRaises(KeyError):
+                kb["KB-NOPE"]
+
+    def test_unusual_records_round_trip(self):
+        article = dict(next(gen.iter_articles()))
+        article.update({
+            "article_id": "legacy-1",
+            "url": "/kb/custom",
+            "popularity_score": 72.5,
+            "locale": "fr",
+        })
+        write_compact(iter([article]), self.path)
+
+        with CompactKB(self.path) as kb:
+            self.assertEqual(kb[article["id"]], article)
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as fp:
+            fp.write(b"[]" * 40)
+
+        with self.assertRaises(CompactFormatError):
+            CompactKB(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Unit tests for kb_build.compress
+"""
+
+import gzip
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+
+import generate_kb_articles as gen
+from kb_build.compress import SizeReport, precompress
+
+
+class PrecompressTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "kb.json")
+        with open(self.path, "w", encoding="utf-8") as fp:
+            fp.write('[{"id": "KB-TECH-001"}]\n' * 50)
+
+    def test_sibling_round_trips_and_is_deterministic(self):
+        size = precompress(self.path)
+        with open(self.path + ".gz", "rb") as fp:
+            first = fp.read()
+        os.remove(self.path + ".gz")
+        precompress(self.path)
+        with open(self.path + ".gz", "rb") as fp:
+            second = fp.read()
+
+        self.assertEqual(size, len(first))
+        self.assertEqual(first, second)
+        with open(self.path, "rb") as fp:
+            self.assertEqual(gzip.decompress(first), fp.read())
+
+    def test_up_to_date_sibling_is_kept(self):
+        precompress(self.path)
+        with open(self.path + ".gz", "wb") as fp:
+            fp.write(b"sentinel")
+        self.assertEqual(precompress(self.path), len(b"sentinel"))
+
+        with open(self.path, "a", encoding="utf-8") as fp:
+            fp.write("[]\n")
+        stat = os.stat(self.path + ".gz")
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        precompress(self.path)
+        with open(self.path + ".gz", "rb") as fp:
+            self.assertTrue(gzip.decompress(fp.read()).endswith(b"[]\n"))
+
+    def test_budget_uses_served_size(self):
+        report = SizeReport()
+        report.add(self.path, compress=True)
+        raw, compressed = report.files[self.path]
+
+        self.assertLess(compressed, raw)
+        self.assertEqual(report.over_budget(compressed), [])
+        self.assertEqual(report.over_budget(compressed - 1), [self.path])
+        self.assertIn("total", report.format())
+
+
+class MainBudgetTest(unittest.TestCase):
+    def test_over_budget_build_fails(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "kb.json")
+            shard_dir = os.path.join(tmp, "shards")
+            stderr = io.StringIO()
+            with redirect_stderr(stderr):
+                ok = gen.main(["-o", path, "--shard-dir", shard_dir, "--precompress"])
+                over = gen.main(["-o", path, "--size-budget", "1k"])
+
+            self.assertTrue(os.path.exists(path + ".gz"))
+            self.assertTrue(os.path.exists(os.path.join(shard_dir, "kb-meta.json.gz")))
+
+        self.assertEqual((ok, over), (0, 1))
+        self.assertIn(f"error: {path} is", stderr.getvalue())
+
+    def test_size_argument(self):
+        self.assertEqual(gen._byte_size("150k"), 150 * 1024)
+        self.assertEqual(gen._byte_size("1M"), 1024 ** 2)
+        self.assertEqual(gen._byte_size("2000"), 2000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+"""
+Unit tests for kb_build.dedup
+"""
+
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from unittest import mock
+
+import generate_kb_articles as gen
+from kb_build import dedup
+from kb_build.catalog import article_context, bound_template
+from kb_build.dedup import (
+    TemplateSigner, find_duplicates, shingle_hashes, signature, similarity,
+)
+from kb_build.templates import Template
+
+
+def paragraph(rng, words=400):
+    vocabulary = [f"word{i}" for i in range(2000)]
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+def edited(text, rng, fraction):
+    words = text.split()
+    for _ in range(int(len(words) * fraction)):
+        words[rng.randrange(len(words))] = "edit"
+    return " ".join(words)
+
+
+class SignatureTest(unittest.TestCase):
+    def test_estimates_jaccard(self):
+        rng = random.Random(3)
+        base = paragraph(rng)
+        for fraction in (0.0, 0.02, 0.1, 0.3):
+            other = edited(base, rng, fraction)
+            a, b = shingle_hashes(base), shingle_hashes(other)
+            exact = len(a & b) / len(a | b)
+            with self.subTest(fraction=fraction):
+                self.assertAlmostEqual(similarity(signature(base), signature(other)), exact, delta=0.15)
+
+    def test_is_deterministic(self):
+        text = gen.generate_article_content("KB-TECH-001", "Cloud Backup: Guide", "Technology")
+        self.assertEqual(signature(text), signature(text))
+        self.assertEqual(len(set(signature(text))), len(signature(text)))
+
+
+class TemplateSignerTest(unittest.TestCase):
+    def test_matches_signature_of_rendered_body(self):
+        for department, infos in gen.articles_data.items():
+            signer = TemplateSigner(bound_template(department))
+            for info in infos:
+                context = article_context(info["id"], info["title"])
+                body = bound_template(department).render(context)
+                key, sign = signer.sign(context)
+                with self.subTest(article=info["id"]):
+                    self.assertEqual(sign(), signature(body))
+
+    def test_slots_inside_and_between_lines(self):
+        template = Template(
+            "# {{title}}\r\n\nstatic line one two three four five\nmore static words here"
+            "\n{{topic}} and {{title}} on one line\n\nfinal static line\n{{topic}}"
+        )
+        signer = TemplateSigner(template)
+        for title, topic in (("Backup Guide", "backup"), ("Multi\nline title", ""), ("", "")):
+            context = {"title": title, "topic": topic}
+            key, sign = signer.sign(context)
+            with self.subTest(title=title):
+                self.assertEqual(sign(), signature(template.render(context)))
+        self.assertNotEqual(key, signer.sign({"title": "x", "topic": ""})[0])
+
+
+class FindDuplicatesTest(unittest.TestCase):
+    def test_clusters_near_duplicates_only(self):
+        rng = random.Random(11)
+        bodies = []
+        for family in range(5):
+            base = paragraph(rng)
+            bodies.append((f"F{family}-0", base))
+            bodies += [(f"F{family}-{n}", edited(base, rng, 0.005)) for n in (1, 2)]
+        bodies.append(("F0-copy", bodies[0][1]))
+        bodies.append(("lonely", paragraph(rng)))
+        rng.shuffle(bodies)
+
+        clusters = find_duplicates(bodies)
+
+        by_family = sorted(sorted(cluster) for cluster in clusters)
+        expected = sorted(
+            sorted(i for i, _ in bodies if i.startswith(f"F{family}-")) for family in range(5)
+        )
+        self.assertEqual(by_family, expected)
+        order = [i for i, _ in bodies]
+        for cluster in clusters:
+            self.assertEqual(cluster, sorted(cluster, key=order.index))
+
+    def test_bodies_without_words(self):
+        rng = random.Random(7)
+        text = paragraph(rng)
+        bodies = [
+            ("empty", ""), ("text", text), ("rule", "---\n***"), ("empty-copy", ""),
+            ("text-copy", text), ("bullets", "- * -"),
+        ]
+        self.assertIsNone(signature("---\n***"))
+
+        clusters = find_duplicates(bodies)
+
+        self.assertEqual(sorted(clusters), [["empty", "empty-copy"], ["text", "text-copy"]])
+
+    def test_cache_hashes_only_new_bodies(self):
+        rng = random.Random(5)
+        bodies = [(f"A{n}", paragraph(rng)) for n in range(4)]
+        bodies.append(("A0-copy", edited(bodies[0][1], rng, 0.005)))
+        cache = {}
+        expected = find_duplicates(bodies, cache=cache)
+        self.assertEqual(len(cache), 5)
+
+        bodies[2] = ("A2", paragraph(rng))
+        with mock.patch.object(dedup, "signature", wraps=dedup.signature) as signature:
+            self.assertEqual(find_duplicates(bodies, cache=cache), expected)
+        self.assertEqual(signature.call_count, 1)
+        self.assertEqual(len(cache), 5)
+
+    def test_rejects_uneven_bands(self):
+        with self.assertRaises(ValueError):
+            find_duplicates([], bands=5)
+
+
+class GeneratorDedupTest(unittest.TestCase):
+    def test_keeps_hand_written_article(self):
+        catalog = {
+            department: [dict(info) for info in infos]
+            for department, infos in gen.articles_data.items()
+        }
+        own = catalog["Marketing"][2]
+        own["content"] = gen.generate_article_content(own["id"], own["title"], "Marketing")
+
+        clusters = gen.duplicate_clusters(catalog)
+
+        self.assertEqual([cluster[0] for cluster in clusters], [own["id"]])
+        remaining = gen.without_duplicates(catalog, clusters)
+        self.assertEqual([i["id"] for infos in remaining.values() for i in infos], [own["id"]])
+
+    def test_main_drop_writes_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "kb.json")
+            report_path = os.path.join(tmp, "duplicates.json")
+            stderr = io.StringIO()
+            with redirect_stderr(stderr):
+                argv = ["-o", path, "--dedup", "drop", "--duplicates", report_path]
+                self.assertEqual(gen.main(argv), 0)
+            with open(path, encoding="utf-8") as fp:
+                articles = json.load(fp)
+            with open(report_path, encoding="utf-8") as fp:
+                report = json.load(fp)
+
+        kept = {cluster["keep"] for cluster in report["clusters"]}
+        self.assertEqual({a["id"] for a in articles}, kept)
+        self.assertIn("dropped", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Unit tests for kb_build.ingest
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from unittest import mock
+
+import generate_kb_articles as gen
+from kb_build import ingest
+from kb_build.ingest import IngestError, iter_records, merge_catalog, normalize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE = """[
+  {
+    "id": "KB-TECH-001",
+    "category": "Technology",
+    "tags": ["backup", "cloud",],
+    "content": `# Title
+
+Use \\`rsync\\` for {braces}, "quotes" and \\${literal} text.\\u{2014}done`,
+  },
+  {"id": "KB-NEW-001", "category": "Technology", "content_summary": "Short, partial"},
+]
+"""
+
+
+class IterRecordsTest(unittest.TestCase):
+    def test_template_literals_and_trailing_commas(self):
+        records = list(iter_records(io.StringIO(SAMPLE)))
+
+        self.assertEqual([r["id"] for r in records], ["KB-TECH-001", "KB-NEW-001"])
+        self.assertEqual(records[0]["tags"], ["backup", "cloud"])
+        self.assertEqual(
+            records[0]["content"],
+            '# Title\n\nUse `rsync` for {braces}, "quotes" and ${literal} text.—done',
+        )
+
+    def test_result_does_not_depend_on_chunk_boundaries(self):
+        expected = list(iter_records(io.StringIO(SAMPLE)))
+        for size in (1, 2, 5, 64):
+            with self.subTest(size=size), mock.patch.object(ingest, "CHUNK_SIZE", size):
+                self.assertEqual(list(iter_records(io.StringIO(SAMPLE))), expected)
+
+    def test_reads_repo_files(self):
+        kb = list(ingest.read_records(os.path.join(ROOT, "data", "kb.json")))
+        batch = list(ingest.read_records(os.path.join(ROOT, "remaining_kb_batch.json")))
+
+        self.assertTrue(kb and all(isinstance(r["content"], str) for r in kb))
+        with open(os.path.join(ROOT, "remaining_kb_batch.json"), encoding="utf-8") as fp:
+            self.assertEqual(batch, json.load(fp))
+
+    def test_errors_name_the_line(self):
+        for text in ('[\n{"id": `open', '[{"id": 1}', '{"id": 1}', '[{"id": 1,,}]'):
+            with self.subTest(text=text), self.assertRaises(IngestError) as caught:
+                list(iter_records(io.StringIO(text), "kb.json"))
+            self.assertRegex(str(caught.exception), r"^kb\.json:\d+: ")
+
+
+class NormalizeTest(unittest.TestCase):
+    def test_null_fields_fall_back_to_defaults(self):
+        _, entry = normalize({
+            "id": "KB-TECH-001", "category": "Technology", "view_count": None,
+            "helpful_votes": "12", "unhelpful_votes": 3.0, "tags": None,
+            "summary": None, "content_summary": "From the batch",
+        })
+        self.assertEqual(entry, {
+            "id": "KB-TECH-001", "summary": "From the batch", "helpful_votes": 12, "unhelpful_votes": 3,
+        })
+
+    def test_wrong_types_name_the_record(self):
+        for field, value in [
+            ("view_count", "many"), ("view_count", -1), ("helpful_votes", 2.5), ("helpful_votes", True),
+            ("popularity_score", "high"), ("tags", "security"), ("tags", [1]), ("title", 7),
+            ("content_summary", ["x"]),
+        ]:
+            record = {"id": "KB-TECH-001", "category": "Technology", field: value}
+            with self.subTest(field=field, value=value), self.assertRaises(IngestError) as caught:
+                normalize(record)
+            self.assertRegex(str(caught.exception), r"^KB-TECH-001: ")
+
+    def test_compact_build_with_null_fields(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source, output = os.path.join(tmp, "in.json"), os.path.join(tmp, "kb.kbc")
+            with open(source, "w", encoding="utf-8") as fp:
+                json.dump([{
+                    "id": "KB-TECH-001", "category": "Technology", "view_count": None,
+                    "helpful_votes": None, "unhelpful_votes": "4", "tags": None,
+                }], fp)
+            with redirect_stderr(io.StringIO()):
+                self.assertEqual(gen.main(["--compact", output, f"--ingest={source}"]), 0)
+
+
+class MergeCatalogTest(unittest.TestCase):
+    def test_later_records_take_precedence(self):
+        catalog = {"Technology": [dict(gen.articles_data["Technology"][0])]}
+        partial = normalize({
+            "id": "KB-TECH-001", "category": "Technology", "title": "Draft",
+            "content_summary": "From the batch",
+        })
+        full = normalize({"id": "KB-TECH-001", "category": "Technology", "title": "Final"})
+
+        merged = merge_catalog(catalog, [partial, full])
+
+        entry = merged["Technology"][0]
+        self.assertEqual((entry["title"], entry["summary"]), ("Final", "From the batch"))
+        self.assertEqual(entry["tags"], gen.articles_data["Technology"][0]["tags"])
+        self.assertEqual(catalog["Technology"][0], gen.articles_data["Technology"][0])
+
+    def test_new_articles(self):
+        records = [normalize(r) for r in iter_records(io.StringIO(SAMPLE))]
+        merged = merge_catalog(gen.articles_data, records)
+        self.assertEqual(merged["Technology"][-1]["summary"], "Short, partial")
+        self.assertEqual(merged["Technology"][-1]["tags"], [])
+
+        with self.assertRaises(IngestError):
+            merge_catalog(gen.articles_data, [normalize({"id": "X-1", "category": "Legal"})])
+        merged = merge_catalog(
+            gen.articles_data, [normalize({"id": "X-1", "category": "Legal", "content": "Body"})]
+        )
+        self.assertEqual(merged["Legal"][0]["content"], "Body")
+
+
+class IngestBuildTest(unittest.TestCase):
+    def test_hand_written_content_replaces_template(self):
+        entry = {**gen.articles_data["Technology"][0], "content": "Hand-written", "view_count": 7}
+        article = gen.build_article("Technology", entry)
+
+        self.assertEqual((article["content"], article["view_count"]), ("Hand-written", 7))
+        self.assertEqual(article["department"], "technology")
+
+    def test_main_builds_full_catalogue(self):
+        sources = [os.path.join(ROOT, "remaining_kb_batch.json"), os.path.join(ROOT, "data", "kb.json")]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "kb.json")
+            argv = ["-o", path, "--incremental"] + [f"--ingest={p}" for p in sources]
+            with redirect_stderr(io.StringIO()):
+                self.assertEqual(gen.main(argv), 0)
+            with open(path, encoding="utf-8") as fp:
+                articles = {a["id"]: a for a in json.load(fp)}
+
+        hand_written = {r["id"]: r for r in ingest.read_records(sources[1])}
+        for article_id, record in hand_written.items():
+            self.assertEqual(articles[article_id]["content"], record["content"])
+            self.assertEqual(articles[article_id]["category"], record["category"])
+        expected_ids = {a["id"] for infos in gen.articles_data.values() for a in infos}
+        self.assertEqual(set(articles), expected_ids | set(hand_written))
+
+
+if __name__ == "__main__":
+    unittest.main()
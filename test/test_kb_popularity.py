@@ -0,0 +1,107 @@
+"""
+Unit tests for kb_build.popularity
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+
+import generate_kb_articles as gen
+from kb_build.popularity import ExportError, PopularityStats, read_popularity
+
+SEARCHES = [
+    {"query": "KB-A", "result_count": "1", "searched_at": "2025-10-01 09:00:00+00"},
+    {"query": "KB-A", "result_count": "1", "searched_at": "2025-10-01 10:00:00.5+00"},
+    {"query": "reset my password", "result_count": "3", "searched_at": "not parsed"},
+    {"query": "KB-B", "result_count": "1", "searched_at": "2025-10-31 09:00:00+00"},
+]
+FEEDBACK = [
+    {"article_id": "KB-B", "helpful": "t", "feedback_text": "", "created_at": "2025-10-31T09:00:00Z"},
+    {"article_id": "KB-B", "helpful": "f", "feedback_text": "", "created_at": "2025-10-31T09:00:00Z"},
+    {"article_id": "KB-GONE", "helpful": "t", "feedback_text": "", "created_at": "2025-10-31T09:00:00Z"},
+]
+
+
+class PopularityStatsTest(unittest.TestCase):
+    def test_decays_by_half_life_in_any_order(self):
+        for rows in (SEARCHES, SEARCHES[::-1]):
+            stats = PopularityStats(["KB-A", "KB-B", "KB-C"], half_life_days=30)
+            for row in rows:
+                stats.add_row(row)
+            scores = stats.scores()
+            # two views 30 days before KB-B's single view are worth one view
+            self.assertAlmostEqual(scores["KB-A"], scores["KB-B"], places=3)
+            self.assertEqual(scores["KB-C"], 0)
+        self.assertEqual(stats.skipped, 1)
+
+    def test_fields_count_votes_and_scale_score(self):
+        stats = PopularityStats(["KB-A", "KB-B", "KB-C"])
+        for row in SEARCHES + FEEDBACK + FEEDBACK[:1]:
+            stats.add_row(row)
+
+        fields = stats.fields()
+        self.assertEqual(fields["KB-B"], {
+            "popularity_score": 100, "helpful_votes": 2, "unhelpful_votes": 1, "view_count": 1,
+        })
+        # KB-B: 1 view + 2 helpful - 1 unhelpful = 4 views' worth; KB-A: about 1
+        self.assertEqual(fields["KB-A"], {
+            "popularity_score": 25, "helpful_votes": 0, "unhelpful_votes": 0, "view_count": 2,
+        })
+        self.assertEqual(fields["KB-C"]["popularity_score"], 0)
+
+    def test_reads_csv_and_gzipped_ndjson(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            searches = os.path.join(tmp, "kb_searches.csv")
+            with open(searches, "w", newline="", encoding="utf-8") as fp:
+                writer = csv.DictWriter(fp, fieldnames=list(SEARCHES[0]))
+                writer.writeheader()
+                writer.writerows(SEARCHES)
+            feedback = os.path.join(tmp, "kb_feedback.ndjson.gz")
+            with gzip.open(feedback, "wt", encoding="utf-8") as fp:
+                for row in FEEDBACK:
+                    fp.write(json.dumps({**row, "helpful": row["helpful"] == "t"}) + "\n")
+
+            from_files = read_popularity(["KB-A", "KB-B"], [searches, feedback]).fields()
+
+        stats = PopularityStats(["KB-A", "KB-B"])
+        for row in SEARCHES + FEEDBACK:
+            stats.add_row(row)
+        self.assertEqual(from_files, stats.fields())
+
+    def test_errors_name_the_line(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "kb_feedback.ndjson")
+            with open(path, "w", encoding="utf-8") as fp:
+                fp.write('{"article_id": "KB-A", "helpful": true}\n{"article_id": "KB-A", "helpful": "maybe"}\n')
+            with self.assertRaisesRegex(ExportError, r"kb_feedback\.ndjson:2: expected a boolean"):
+                read_popularity(["KB-A"], [path])
+            with self.assertRaises(ExportError):
+                read_popularity(["KB-A"], [os.path.join(tmp, "kb_feedback.xlsx")])
+
+
+class MainStatsTest(unittest.TestCase):
+    def test_embeds_popularity(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "kb_searches.ndjson")
+            with open(path, "w", encoding="utf-8") as fp:
+                for when in ("2025-10-01T00:00:00Z", "2025-10-02T00:00:00Z"):
+                    fp.write(json.dumps({"query": "KB-TECH-002", "searched_at": when}) + "\n")
+            output = os.path.join(tmp, "kb.json")
+            with redirect_stderr(io.StringIO()) as stderr:
+                self.assertEqual(gen.main(["-o", output, "--stats", path]), 0)
+            with open(output, encoding="utf-8") as fp:
+                articles = {a["id"]: a for a in json.load(fp)}
+
+        self.assertEqual(articles["KB-TECH-002"]["view_count"], 2)
+        self.assertEqual(articles["KB-TECH-002"]["popularity_score"], 100)
+        self.assertEqual(articles["KB-TECH-001"]["view_count"], 0)
+        self.assertIn("Popularity: 2 rows", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
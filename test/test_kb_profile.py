@@ -0,0 +1,78 @@
+"""
+Unit tests for kb_build.profile
+"""
+
+import io
+import json
+import os
+import tempfile
+import tracemalloc
+import unittest
+from contextlib import redirect_stderr
+
+import generate_kb_articles as gen
+from kb_build.profile import ARTICLE_TRACK, STAGE_TRACK, BuildProfiler
+
+
+class BuildProfilerTest(unittest.TestCase):
+    def setUp(self):
+        self.profiler = BuildProfiler()
+        self.addCleanup(self.profiler.close)
+
+    def test_records_stages_and_articles(self):
+        with self.profiler.stage("allocate"):
+            block = [bytes(1024) for _ in range(200)]
+        del block
+        self.assertEqual(self.profiler.article("A", lambda: "x" * 10), "x" * 10)
+        self.profiler.article("B", lambda: sum(range(20000)))
+
+        (name, start, wall, cpu, peak), = self.profiler.stages
+        self.assertEqual(name, "allocate")
+        self.assertGreaterEqual(start, 0)
+        self.assertGreaterEqual(peak, 200 * 1024)
+        self.assertEqual([sample[0] for sample in self.profiler.slowest(1)], ["B"])
+
+    def test_trace_event_format(self):
+        with self.profiler.stage("render"):
+            pass
+        self.profiler.article("KB-1", lambda: None)
+
+        events = self.profiler.trace()["traceEvents"]
+        complete = [e for e in events if e["ph"] == "X"]
+        self.assertEqual([(e["name"], e["cat"], e["tid"]) for e in complete], [
+            ("render", "stage", STAGE_TRACK),
+            ("KB-1", "article", ARTICLE_TRACK),
+        ])
+        self.assertTrue(all({"ts", "dur", "pid", "args"} <= set(e) for e in complete))
+        self.assertEqual(sum(e["ph"] == "M" for e in events), 2)
+
+    def test_stops_tracing_it_started(self):
+        self.profiler.close()
+        self.assertFalse(tracemalloc.is_tracing())
+
+
+class MainProfileTest(unittest.TestCase):
+    def test_writes_trace_and_tables(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            trace_path = os.path.join(tmp, "trace.json")
+            argv = [
+                "-o", os.path.join(tmp, "kb.json"),
+                "--search-index", os.path.join(tmp, "kb-index.json"),
+                "--profile", trace_path, "--profile-top", "3",
+            ]
+            stderr = io.StringIO()
+            with redirect_stderr(stderr):
+                self.assertEqual(gen.main(argv), 0)
+            with open(trace_path, encoding="utf-8") as fp:
+                events = json.load(fp)["traceEvents"]
+
+        stages = [e["name"] for e in events if e.get("cat") == "stage"]
+        self.assertEqual(stages, ["load", "dedup", "related", "output", "search_index"])
+        articles = [e["name"] for e in events if e.get("cat") == "article"]
+        self.assertEqual(len(articles), sum(len(a) for a in gen.articles_data.values()))
+        self.assertIn("Slowest 3 articles", stderr.getvalue())
+        self.assertFalse(tracemalloc.is_tracing())
+
+
+if __name__ == "__main__":
+    unittest.main()
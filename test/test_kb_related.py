@@ -0,0 +1,65 @@
+"""
+Unit tests for kb_build.related
+"""
+
+import random
+import unittest
+
+import generate_kb_articles as gen
+from kb_build.related import related_positions
+
+
+def brute_force(records, k):
+    # Straight port of KnowledgeBaseService.getRelatedArticles()
+    related = []
+    for position, (category, department, tags) in enumerate(records):
+        scored = []
+        for other, (other_category, other_department, other_tags) in enumerate(records):
+            if other == position:
+                continue
+            score = (3 if other_category == category else 0) + (
+                2 if other_department == department else 0
+            )
+            score += sum(1 for tag in tags if tag in other_tags)
+            if score > 0:
+                scored.append((score, other))
+        scored.sort(key=lambda item: -item[0])
+        related.append([other for _, other in scored[:k]])
+    return related
+
+
+class RelatedPositionsTest(unittest.TestCase):
+    def test_matches_client_ranking(self):
+        rng = random.Random(7)
+
+        def record():
+            tags = [rng.choice("pqrstuv") for _ in range(rng.randint(0, 4))]
+            return (rng.choice("ABC"), rng.choice("xyz"), tags)
+
+        for _ in range(200):
+            # Mix repeated signatures (tenant variants) with one-offs
+            variants = [record() for _ in range(rng.randint(1, 6))]
+            records = [
+                rng.choice(variants) if rng.random() < 0.5 else record()
+                for _ in range(rng.randint(1, 30))
+            ]
+            k = rng.randint(1, 6)
+            self.assertEqual(related_positions(records, k), brute_force(records, k))
+
+    def test_unrelated_articles_are_dropped(self):
+        records = [("A", "x", ["t"]), ("B", "y", ["u"])]
+        self.assertEqual(related_positions(records, 5), [[], []])
+
+
+class WithRelatedTest(unittest.TestCase):
+    def test_entries_carry_related_ids(self):
+        catalog = gen.with_related(gen.articles_data, 3)
+        first = catalog["Technology"][0]
+
+        self.assertEqual(first["related"], ["KB-TECH-002", "KB-TECH-003", "KB-TECH-004"])
+        self.assertNotIn("related", gen.articles_data["Technology"][0])
+        self.assertEqual(gen.build_article("Technology", first)["related"], first["related"])
+
+
+if __name__ == "__main__":
+    unittest.main()
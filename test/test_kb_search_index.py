@@ -0,0 +1,116 @@
+"""
+Unit tests for kb_build.search_index
+"""
+
+import io
+import json
+import os
+import unittest
+
+import generate_kb_articles as gen
+from kb_build.search_index import build_search_index, read_synonyms, tokenize, write_search_index
+
+
+def decode(gaps):
+    position = 0
+    positions = []
+    for gap in gaps:
+        position += gap
+        positions.append(position)
+    return positions
+
+
+class TokenizeTest(unittest.TestCase):
+    def test_indexes_all_fields(self):
+        terms = tokenize({
+            "title": "TitleWord",
+            "category": "CategoryWord",
+            "department": "DepartmentWord",
+            "tags": ["TagWord"],
+            "summary": "SummaryWord test",
+            "content": "ContentWord test",
+        })
+
+        self.assertEqual(terms, {
+            "titleword", "categoryword", "departmentword", "tagword",
+            "summaryword", "contentword", "test",
+        })
+
+    def test_skips_short_words_like_the_client(self):
+        # Missing fields stringify as in a JS template literal
+        self.assertEqual(tokenize({"title": "a bb ccc dddd", "tags": []}),
+                         {"ccc", "dddd", "undefined"})
+
+    def test_splits_on_js_whitespace_only(self):
+        terms = tokenize({"title": "one two three four-five", "category": "",
+                          "department": ""})
+
+        self.assertEqual(terms, {"one", "two", "three", "four-five"})
+
+
+class SearchIndexTest(unittest.TestCase):
+    articles = [
+        {"id": "KB-1", "title": "Backup Guide", "category": "", "department": ""},
+        {"id": "KB-2", "title": "Email Guide", "category": "", "department": ""},
+        {"id": "KB-3", "title": "Backup Policy", "category": "", "department": ""},
+    ]
+
+    def test_postings_are_gap_encoded_with_df(self):
+        index = build_search_index(self.articles)
+
+        self.assertEqual(index["ids"], ["KB-1", "KB-2", "KB-3"])
+        self.assertEqual(decode(index["postings"]["backup"]), [0, 2])
+        self.assertEqual(decode(index["postings"]["guide"]), [0, 1])
+        self.assertEqual(index["df"]["backup"], 2)
+        self.assertEqual(index["df"]["policy"], 1)
+
+    def test_write_search_index(self):
+        buf = io.StringIO()
+        terms = write_search_index(iter(self.articles), buf, related=5)
+        index = json.loads(buf.getvalue())
+
+        self.assertEqual(terms, len(index["postings"]))
+        self.assertEqual(index["articles"], 3)
+        self.assertEqual(index["related"], 5)
+        self.assertNotIn("related", build_search_index(self.articles))
+
+
+class SynonymTableTest(unittest.TestCase):
+    def test_matches_client_scan(self):
+        articles = list(gen.iter_articles(gen.ingest_catalog(
+            gen.articles_data, [os.path.join(os.path.dirname(gen.TEMPLATE_DIR), "kb.json")]
+        )))
+        synonyms = read_synonyms(gen.SYNONYMS_FILE)
+        table = build_search_index(articles, synonyms)["synonyms"]
+
+        # Straight port of the old KnowledgeBaseService.findSemanticMatches()
+        for query in ("security hack", "slow website", "email marketing design", "nothing"):
+            expected = {}
+            for index, article in enumerate(articles):
+                text = f"{article['title']} {article['summary']} {article['content']}".lower()
+                score = sum(
+                    0.5 for term, words in synonyms.items() if term in query
+                    for word in words if word in text
+                )
+                if score:
+                    expected[index] = score
+
+            scores = {}
+            for term, words in table["terms"].items():
+                if term in query:
+                    for word, weight in words.items():
+                        for index in decode(table["postings"].get(word, [])):
+                            scores[index] = scores.get(index, 0) + weight
+            with self.subTest(query=query):
+                self.assertEqual(scores, expected)
+
+    def test_omitted_without_dictionary(self):
+        self.assertNotIn("synonyms", build_search_index(SearchIndexTest.articles))
+
+    def test_missing_fields_stringify_like_js(self):
+        index = build_search_index([{"id": "KB-1", "title": "x"}], {"any": ["undefined"]})
+        self.assertEqual(index["synonyms"]["postings"], {"undefined": [0]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Unit tests for kb_build.shards
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+import generate_kb_articles as gen
+from kb_build.shards import hash_bucket, write_sharded
+
+
+def read_json(*parts):
+    with open(os.path.join(*parts), encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+class WriteShardedTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.articles = list(gen.iter_articles())
+
+    def test_department_shards_round_trip(self):
+        layout = write_sharded(iter(self.articles), self.tmp.name, related=5)
+
+        self.assertEqual(layout, read_json(self.tmp.name, "kb-shards.json"))
+        self.assertEqual(len(layout["shards"]), len(gen.articles_data))
+        self.assertEqual(layout["related"], 5)
+
+        metadata = read_json(self.tmp.name, layout["metadata"])
+        self.assertEqual([m["id"] for m in metadata], [a["id"] for a in self.articles])
+        self.assertTrue(all("content" not in m for m in metadata))
+
+        for article in self.articles:
+            shard = layout["shards"][layout["articles"][article["id"]]]
+            bodies = read_json(self.tmp.name, shard["path"])
+            self.assertEqual(bodies[article["id"]], article["content"])
+
+    def test_hash_shards_replace_previous_layout(self):
+        write_sharded(iter(self.articles), self.tmp.name)
+        open(os.path.join(self.tmp.name, "kb-shards", "technology.json.gz"), "wb").close()
+        layout = write_sharded(iter(self.articles), self.tmp.name, shard_by="hash", buckets=4)
+
+        files = sorted(os.listdir(os.path.join(self.tmp.name, "kb-shards")))
+        self.assertEqual(files, sorted(name + ".json" for name in layout["shards"]))
+        self.assertTrue(set(layout["shards"]) <= {"0", "1", "2", "3"})
+        self.assertEqual(sum(s["articles"] for s in layout["shards"].values()), len(self.articles))
+
+    def test_hash_bucket_is_stable(self):
+        self.assertEqual(hash_bucket("KB-TECH-001", 16), hash_bucket("KB-TECH-001", 16))
+        self.assertTrue(0 <= hash_bucket("KB-TECH-001", 16) < 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
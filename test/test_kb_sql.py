@@ -0,0 +1,103 @@
+"""
+Unit tests for kb_build.sql, loading into SQLite as a Postgres stand-in
+"""
+
+import io
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+
+import generate_kb_articles as gen
+from kb_build.sql import COLUMN_NAMES, article_row, copy_line, write_sql
+
+
+def load(connection, articles, **options):
+    script = io.StringIO()
+    count = write_sql(articles, script, dialect="sqlite", **options)
+    before = connection.total_changes
+    connection.executescript(script.getvalue())
+    return count, connection.total_changes - before, script.getvalue()
+
+
+def copy_fields(line):
+    """Decode one COPY text-format line (the escapes copy_line() produces)"""
+    escapes = {"\\\\": "\\", "\\t": "\t", "\\n": "\n", "\\r": "\r"}
+    return [
+        None if field == "\\N" else re.sub(r"\\[\\tnr]", lambda m: escapes[m.group()], field)
+        for field in line.rstrip("\n").split("\t")
+    ]
+
+
+class WriteSqlTest(unittest.TestCase):
+    def setUp(self):
+        self.articles = list(gen.iter_articles())
+        self.db = sqlite3.connect(":memory:")
+        self.addCleanup(self.db.close)
+
+    def test_batched_upserts_load_every_article(self):
+        count, changed, script = load(self.db, self.articles, batch_size=7)
+
+        self.assertEqual((count, changed), (30, 30))
+        self.assertEqual(script.count("INSERT INTO kb_articles"), 5)
+        rows = self.db.execute("SELECT id, tags, content FROM kb_articles ORDER BY rowid").fetchall()
+        self.assertEqual(
+            rows,
+            [(a["id"], json.dumps(a["tags"]), a["content"]) for a in self.articles],
+        )
+
+    def test_reload_touches_only_changed_rows(self):
+        load(self.db, self.articles)
+        self.assertEqual(load(self.db, self.articles)[1], 0)
+
+        edited = [dict(a) for a in self.articles]
+        edited[4]["title"] = "It's \"new\"; DROP TABLE kb_articles; --"
+        self.assertEqual(load(self.db, edited)[1], 1)
+        title, = self.db.execute(
+            "SELECT title FROM kb_articles WHERE id = ?", (edited[4]["id"],)
+        ).fetchone()
+        self.assertEqual(title, edited[4]["title"])
+
+    def test_copy_rows_round_trip(self):
+        article = {
+            **self.articles[0],
+            "content": "line one\n\tindented \\ backslash\r\n",
+            "tags": ['a "quoted", tag', "back\\slash"],
+        }
+        row = article_row(article)
+        fields = copy_fields(copy_line(row))
+
+        self.assertEqual(len(fields), len(COLUMN_NAMES))
+        self.assertEqual(fields[COLUMN_NAMES.index("content")], article["content"])
+        self.assertEqual(
+            fields[COLUMN_NAMES.index("tags")], '{"a \\"quoted\\", tag","back\\\\slash"}'
+        )
+        self.assertIsNone(fields[COLUMN_NAMES.index("related")])
+
+    def test_copy_needs_postgres(self):
+        with self.assertRaises(ValueError):
+            write_sql(self.articles, io.StringIO(), fmt="copy", dialect="sqlite")
+
+
+class MainEmitSqlTest(unittest.TestCase):
+    def test_emits_loadable_script(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "kb_articles.sql")
+            with redirect_stderr(io.StringIO()):
+                self.assertEqual(gen.main(["--emit-sql", path, "--sql-dialect", "sqlite"]), 0)
+            with open(path, encoding="utf-8") as fp:
+                script = fp.read()
+
+        db = sqlite3.connect(":memory:")
+        self.addCleanup(db.close)
+        db.executescript(script)
+        related, = db.execute("SELECT related FROM kb_articles WHERE id = 'KB-TECH-001'").fetchone()
+        expected = gen.with_related(gen.articles_data)["Technology"][0]["related"]
+        self.assertEqual(json.loads(related), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Unit tests for kb_build.templates
+"""
+
+import os
+import tempfile
+import unittest
+
+from kb_build.templates import Template, TemplateError, TemplateSet
+
+
+class TemplateTest(unittest.TestCase):
+    def test_render_fills_slots(self):
+        template = Template("# {{title}}\n\nBy the {{ department }} team, {{title}}.")
+        text = template.render({"title": "Guide", "department": "Branding"})
+
+        self.assertEqual(text, "# Guide\n\nBy the Branding team, Guide.")
+        self.assertEqual(template.slots, {"title", "department"})
+
+    def test_static_only_template(self):
+        self.assertEqual(Template("no slots, 100% static").render({}), "no slots, 100% static")
+
+    def test_unknown_slot_rejected_at_compile_time(self):
+        with self.assertRaises(TemplateError):
+            Template("{{title}} {{oops}}", allowed_slots={"title"})
+
+    def test_missing_value_raises(self):
+        with self.assertRaises(TemplateError):
+            Template("{{title}}").render({})
+
+    def test_partial_bakes_in_known_slots(self):
+        template = Template("{{department}}: {{title}}").partial({"department": "Content"})
+
+        self.assertEqual(template.slots, {"title"})
+        self.assertEqual(template.render({"title": "Blogs"}), "Content: Blogs")
+
+
+class TemplateSetTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.write("default.tmpl", "default {{title}}\n")
+        self.write("branding.tmpl", "branding {{title}}\n")
+
+    def write(self, name, text):
+        with open(os.path.join(self.tmp.name, name), "w", encoding="utf-8") as fp:
+            fp.write(text)
+
+    def test_department_file_overrides_default(self):
+        templates = TemplateSet(self.tmp.name)
+
+        self.assertEqual(templates.for_department("branding").render({"title": "x"}), "branding x")
+        self.assertEqual(templates.for_department("content").render({"title": "x"}), "default x")
+
+    def test_missing_default_raises(self):
+        os.remove(os.path.join(self.tmp.name, "default.tmpl"))
+
+        with self.assertRaises(TemplateError):
+            TemplateSet(self.tmp.name).for_department("content")
+
+
+if __name__ == "__main__":
+    unittest.main()
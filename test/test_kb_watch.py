@@ -0,0 +1,112 @@
+"""
+Unit tests for kb_build.watch and generate_kb_articles --watch
+"""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stderr
+from unittest import mock
+
+import generate_kb_articles as gen
+from kb_build.watch import SourceWatcher
+
+
+def touch(path, text, bump=0):
+    with open(path, "w", encoding="utf-8") as fp:
+        fp.write(text)
+    if bump:
+        # Coarse filesystem timestamps: make the change visible by mtime too
+        info = os.stat(path)
+        os.utime(path, ns=(info.st_atime_ns, info.st_mtime_ns + bump))
+
+
+class SourceWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = os.path.join(self.tmp.name, "templates")
+        os.mkdir(self.dir)
+        self.file = os.path.join(self.tmp.name, "batch.json")
+        touch(os.path.join(self.dir, "default.tmpl"), "# {{title}}")
+        touch(self.file, "[]")
+
+    def test_reports_modified_added_and_removed_files(self):
+        watcher = SourceWatcher([self.dir, self.file])
+        self.assertEqual(watcher.poll(), [])
+
+        touch(self.file, "[ ]", bump=10 ** 9)
+        added = os.path.join(self.dir, "branding.tmpl")
+        touch(added, "# Brand")
+        touch(os.path.join(self.dir, "notes.txt"), "ignored")
+        self.assertEqual(watcher.poll(), sorted([self.file, added]))
+
+        os.remove(added)
+        self.assertEqual(watcher.poll(), [added])
+        self.assertEqual(watcher.poll(), [])
+
+    def test_missing_paths_are_watched_for_creation(self):
+        later = os.path.join(self.tmp.name, "later.json")
+        watcher = SourceWatcher([later])
+        touch(later, "[]")
+        self.assertEqual(watcher.wait(0.01), [later])
+
+
+class MainWatchTest(unittest.TestCase):
+    def test_rebuilds_affected_articles_on_template_change(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            templates = os.path.join(tmp, "templates")
+            shutil.copytree(gen.TEMPLATE_DIR, templates)
+            output = os.path.join(tmp, "kb.json")
+            changes_path = os.path.join(tmp, "changes.json")
+            args = gen.parse_args([
+                "-o", output, "--changes", changes_path, "--templates", templates,
+                "--watch", "--poll-interval", "0.01",
+            ])
+            branding = os.path.join(templates, "branding.tmpl")
+
+            def edit_after_first_build():
+                while not os.path.exists(output):
+                    time.sleep(0.01)
+                touch(branding, "# {{title}}\n\nBranding body for {{topic}}.\n")
+
+            editor = threading.Thread(target=edit_after_first_build)
+            editor.start()
+            with redirect_stderr(io.StringIO()) as stderr:
+                self.assertEqual(gen.watch(args, builds=2), 0)
+            editor.join()
+
+            with open(output, encoding="utf-8") as fp:
+                articles = json.load(fp)
+            with open(changes_path, encoding="utf-8") as fp:
+                changes = json.load(fp)
+
+        branded = [a for a in articles if a["category"] == "Branding"]
+        self.assertTrue(all(a["content"].startswith("# " + a["title"]) for a in branded))
+        self.assertTrue(all("Branding body" in a["content"] for a in branded))
+        self.assertEqual(sorted(changes["changed"]), sorted(a["id"] for a in branded))
+        self.assertEqual(changes["rendered"], len(branded))
+        self.assertIn("Changed: " + branding, stderr.getvalue())
+
+    def test_reports_any_build_error(self):
+        args = gen.parse_args(["-o", os.devnull, "--watch"])
+        failure = TypeError("unsupported operand type(s)")
+        with mock.patch.object(gen, "_run", side_effect=failure) as run, \
+                redirect_stderr(io.StringIO()) as stderr:
+            self.assertEqual(gen.watch(args, builds=1), 0)
+
+        run.assert_called_once()
+        self.assertIn("error: unsupported operand type(s); previous outputs kept", stderr.getvalue())
+
+    def test_rejects_stdout(self):
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            gen.parse_args(["-o", "-", "--watch"])
+
+
+if __name__ == "__main__":
+    unittest.main()